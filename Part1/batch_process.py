@@ -0,0 +1,184 @@
+import argparse
+import os
+import sys
+import time
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import cv2
+import numpy as np
+
+# The operator library shared by Image Lab and Live Cam FX is the ../common package
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+import operations
+from common import imageops
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff")
+
+
+def find_images(input_dir, extensions=IMAGE_EXTENSIONS):
+    """Yield paths of all images below input_dir, relative to it, in sorted order"""
+    for folder, subfolders, files in os.walk(input_dir):
+        subfolders.sort()
+        for name in sorted(files):
+            if name.lower().endswith(extensions):
+                yield os.path.relpath(os.path.join(folder, name), input_dir)
+
+
+def read_file(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def write_file(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def file_seed(seed, relative_path):
+    """Seed for one file, derived from the batch seed and its path in the tree"""
+    if seed is None:
+        return None
+    path_hash = zlib.crc32(relative_path.replace(os.sep, "/").encode("utf-8"))
+    return int(np.random.SeedSequence([seed, path_hash]).generate_state(1)[0])
+
+
+def init_worker():
+    # One OpenCV thread per process, the pool already uses every core
+    imageops.configure_threads(1)
+
+
+def process_image(data, chain, extension, seed=None):
+    """Decode, run the operation chain and re-encode one image.
+
+    Runs inside a worker process; only compressed bytes cross the process
+    boundary, never decoded pixel buffers.
+    """
+    img = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        raise ValueError("cannot decode image")
+
+    result = operations.apply_chain(img, chain, seed)
+
+    ok, buffer = cv2.imencode(extension, result)
+    if not ok:
+        raise ValueError(f"cannot encode result as {extension}")
+    return buffer.tobytes()
+
+
+def run_batch(input_dir, output_dir, chain, workers=None, readers=4, writers=2, output_format=None, seed=None):
+    """Process every image below input_dir into the same tree under output_dir.
+
+    Reading, processing and writing overlap: a thread pool prefetches file
+    contents, a process pool runs the operations, and finished images are
+    written by a second thread pool. At most 2 * workers images are being
+    read, processed or written at any time, so memory stays bounded for
+    large trees. With a seed, noise and watermarks are reproducible: each
+    file gets its own seed derived from the batch seed and its path.
+
+    Returns (processed, errors) where errors is a list of (path, message).
+    """
+    workers = workers or os.cpu_count() or 1
+    window = 2 * workers
+
+    paths = iter(find_images(input_dir))
+    reading = {}
+    processing = {}
+    writing = {}
+    processed = 0
+    errors = []
+
+    with ThreadPoolExecutor(readers, thread_name_prefix="batch-read") as read_pool, \
+            ProcessPoolExecutor(workers, initializer=init_worker) as process_pool, \
+            ThreadPoolExecutor(writers, thread_name_prefix="batch-write") as write_pool:
+
+        def fill_window():
+            while len(reading) + len(processing) + len(writing) < window:
+                relative_path = next(paths, None)
+                if relative_path is None:
+                    return
+                future = read_pool.submit(read_file, os.path.join(input_dir, relative_path))
+                reading[future] = relative_path
+
+        fill_window()
+        while reading or processing or writing:
+            done, _ = wait(list(reading) + list(processing) + list(writing), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                if future in reading:
+                    relative_path = reading.pop(future)
+                    stage = "read"
+                elif future in processing:
+                    relative_path = processing.pop(future)
+                    stage = "process"
+                else:
+                    relative_path = writing.pop(future)
+                    stage = "write"
+
+                try:
+                    result = future.result()
+                except Exception as e:
+                    errors.append((relative_path, f"{stage}: {e}"))
+                    continue
+
+                if stage == "read":
+                    extension = output_format or os.path.splitext(relative_path)[1].lower()
+                    processing[process_pool.submit(process_image, result, chain, extension,
+                                                   file_seed(seed, relative_path))] = relative_path
+                elif stage == "process":
+                    output_path = os.path.join(output_dir, relative_path)
+                    if output_format:
+                        output_path = os.path.splitext(output_path)[0] + output_format
+                    writing[write_pool.submit(write_file, output_path, result)] = relative_path
+                else:
+                    processed += 1
+
+            fill_window()
+
+    return processed, errors
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Apply Image Lab operations to a whole directory tree")
+    parser.add_argument("input_dir", help="Folder with the source images (searched recursively)")
+    parser.add_argument("output_dir", help="Folder for the results; the input tree is mirrored")
+    parser.add_argument("--ops", required=True,
+                        help="Comma separated operations, e.g. 'grayscale,noise:0.05,median:5' (noise takes the fraction of corrupted pixels). "
+                             f"Available: {', '.join(operations.OPERATIONS)}")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: number of cores)")
+    parser.add_argument("--readers", type=int, default=4, help="Prefetch threads reading input files")
+    parser.add_argument("--writers", type=int, default=2, help="Threads writing output files")
+    parser.add_argument("--format", choices=[".png", ".jpg", ".bmp", ".tif"],
+                        help="Output format (default: same as the input file)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Seed for noise and watermark placement, for reproducible outputs")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    try:
+        chain = operations.parse_chain(args.ops)
+    except ValueError as e:
+        sys.exit(str(e))
+    if not os.path.isdir(args.input_dir):
+        sys.exit(f"Input folder not found: {args.input_dir}")
+
+    start_time = time.perf_counter()
+    processed, errors = run_batch(args.input_dir, args.output_dir, chain, args.workers,
+                                  args.readers, args.writers, args.format, args.seed)
+    elapsed = time.perf_counter() - start_time
+
+    for path, message in errors:
+        print(f"FAILED {path}: {message}")
+    rate = processed / elapsed if elapsed > 0 else 0.0
+    print(f"Processed {processed} image(s) in {elapsed:.2f}s ({rate:.1f} images/s), {len(errors)} failed")
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
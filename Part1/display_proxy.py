@@ -0,0 +1,112 @@
+import weakref
+
+import cv2
+from PIL import Image, ImageTk
+
+REDUCED_DECODE_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2)
+)
+
+
+# Start-of-frame markers carry the image size; C4, C8 and CC are other segments
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def jpeg_size(path):
+    """(width, height) from a JPEG header, or None if path is not a JPEG"""
+    try:
+        with open(path, "rb") as f:
+            if f.read(2) != b"\xff\xd8":
+                return None
+            while True:
+                marker = f.read(2)
+                if len(marker) < 2 or marker[0] != 0xFF:
+                    return None
+                if marker[1] in (0x01, 0xFF) or 0xD0 <= marker[1] <= 0xD7:
+                    continue
+                length = f.read(2)
+                if len(length) < 2:
+                    return None
+                if marker[1] in JPEG_SOF_MARKERS:
+                    header = f.read(5)
+                    if len(header) < 5:
+                        return None
+                    return int.from_bytes(header[3:5], "big"), int.from_bytes(header[1:3], "big")
+                f.seek(int.from_bytes(length, "big") - 2, 1)
+    except OSError:
+        return None
+
+
+def read_preview(path, max_size):
+    """Decode path at 1/2, 1/4 or 1/8 scale if that still covers max_size.
+
+    Only JPEGs get a preview: their header is parsed for the size and they
+    are decoded directly at the reduced scale, which is far cheaper than a
+    full decode. OpenCV decodes other formats in full before shrinking them,
+    so a preview would cost as much as the real load. Returns None when
+    there is no cheap preview; the caller then just waits for the full decode.
+    """
+    size = jpeg_size(path)
+    if size is None:
+        return None
+
+    for factor, flag in REDUCED_DECODE_FLAGS:
+        if max(size) / factor >= max_size:
+            return cv2.imread(path, flag)
+    return None
+
+
+class DisplayProxy:
+    """Downscaled copies of one result image, built once and reused.
+
+    The full-resolution image is only read when the first proxy is made;
+    every smaller size afterwards is derived from the closest cached level,
+    so redraws and previews never touch the original pixels again. The
+    source is only weakly referenced: the proxy owns nothing but its
+    display-sized levels, so it never keeps an image alive that the
+    history has already evicted.
+    """
+
+    def __init__(self, img):
+        self.source_ref = weakref.ref(img)
+        self.height, self.width = img.shape[:2]
+        self.levels = {}
+        self.photos = {}
+
+    @property
+    def source(self):
+        """The full-resolution image, or None once nothing else holds it"""
+        return self.source_ref()
+
+    def get(self, max_size):
+        """Image whose longer side is at most max_size (never upscaled)"""
+        source = self.source
+        scale = min(max_size / self.width, max_size / self.height, 1.0)
+        if scale >= 1.0:
+            return source
+
+        size = (max(1, int(self.width * scale)), max(1, int(self.height * scale)))
+        level = self.levels.get(size)
+        if level is None:
+            # Start from the smallest cached level that is still large enough
+            base = source
+            for cached_size, cached in self.levels.items():
+                if cached_size[0] >= size[0] and cached_size[1] >= size[1] and cached_size[0] < base.shape[1]:
+                    base = cached
+            level = cv2.resize(base, size, interpolation=cv2.INTER_AREA)
+            self.levels[size] = level
+        return level
+
+    def photo(self, max_size, is_grayscale=False):
+        """Cached Tk image of the proxy for max_size"""
+        key = (max_size, is_grayscale)
+        photo = self.photos.get(key)
+        if photo is None:
+            img = self.get(max_size)
+            if not is_grayscale and len(img.shape) == 3:
+                img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+            photo = ImageTk.PhotoImage(Image.fromarray(img))
+            self.photos[key] = photo
+        return photo
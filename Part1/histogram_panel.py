@@ -0,0 +1,96 @@
+from tkinter import Canvas
+
+import cv2
+import numpy as np
+
+CHANNEL_COLORS = ("#1f77b4", "#2ca02c", "#d62728")
+
+
+def compute_histogram(img):
+    """256-bin histogram per channel, shape (channels, 256)"""
+    channels = 1 if len(img.shape) == 2 else img.shape[2]
+    return np.stack([
+        cv2.calcHist([img], [channel], None, [256], [0, 256]).ravel()
+        for channel in range(channels)
+    ])
+
+
+def equalization_lut(hist):
+    """Lookup table cv2.equalizeHist derives from a grayscale histogram"""
+    hist = np.asarray(hist, dtype=np.int64).ravel()
+    lut = np.zeros(256, dtype=np.uint8)
+    nonzero = np.flatnonzero(hist)
+    if len(nonzero) == 0:
+        return lut
+
+    first = nonzero[0]
+    total = hist.sum()
+    if hist[first] == total:
+        lut[:] = first
+        return lut
+
+    # Same float32 arithmetic and rounding as OpenCV, so the table is exact
+    scale = np.float32(255.0) / np.float32(total - hist[first])
+    cumulative = np.cumsum(hist[first + 1:]).astype(np.float32)
+    lut[first + 1:] = np.clip(np.rint(cumulative * scale), 0, 255)
+    return lut
+
+
+def remap_histogram(hist, lut):
+    """Histogram after applying lut to every pixel, without touching the image"""
+    return np.stack([np.bincount(lut, weights=channel, minlength=256) for channel in hist])
+
+
+class HistogramPanel:
+    """Histogram drawn on a small Tk canvas inside the main window.
+
+    The histogram of the last shown image is kept, so point operations can
+    derive the next one from it with remap_histogram instead of re-binning
+    every pixel.
+    """
+
+    def __init__(self, parent, width=280, height=120, bg="#ffffff"):
+        self.width = width
+        self.height = height
+        self.canvas = Canvas(parent, width=width, height=height, bg=bg, highlightthickness=0)
+        self.source = None
+        self.histogram = None
+
+    def pack(self, **kwargs):
+        self.canvas.pack(**kwargs)
+
+    def histogram_of(self, img):
+        """Histogram of img, reused if img is the image shown last"""
+        if img is self.source:
+            return self.histogram
+        return compute_histogram(img)
+
+    def show(self, img, histogram=None, reference=None, title=""):
+        """Draw the histogram of img, optionally over a grey reference histogram"""
+        if histogram is None:
+            histogram = self.histogram_of(img)
+        self.source = img
+        self.histogram = histogram
+
+        self.canvas.delete("all")
+        peak = max(histogram.max(), reference.max() if reference is not None else 0, 1)
+        if reference is not None:
+            self.draw_series(reference.sum(axis=0) / len(reference), peak, "#adb5bd")
+
+        colors = ("#495057",) if len(histogram) == 1 else CHANNEL_COLORS
+        for channel, color in zip(histogram, colors):
+            self.draw_series(channel, peak, color)
+
+        if title:
+            self.canvas.create_text(4, 2, text=title, anchor="nw", font=("Arial", 8), fill="#495057")
+
+    def draw_series(self, values, peak, color):
+        x = np.arange(256) * (self.width - 1) / 255.0
+        y = self.height - 1 - values / peak * (self.height - 14)
+        points = np.column_stack([x, y]).ravel().tolist()
+        self.canvas.create_line(*points, fill=color)
+
+    def clear(self):
+        self.canvas.delete("all")
+        self.source = None
+        self.histogram = None
@@ -0,0 +1,158 @@
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+DEFAULT_BUDGET_MB = 512
+
+
+class HistoryStep:
+    """One entry of the operation history.
+
+    function/args describe how to recompute the image from the parent step;
+    steps without a function (random noise, user input) can only be restored
+    from their compressed copy.
+    """
+
+    def __init__(self, label, parent=None, function=None, args=()):
+        self.label = label
+        self.parent = parent
+        self.function = function
+        self.args = args
+        self.compressed = None
+
+    @property
+    def recomputable(self):
+        return self.function is not None and self.parent is not None
+
+
+class OperationHistory:
+    """Linear undo/redo history with an LRU cache of intermediate images.
+
+    Decoded images are kept up to memory_budget bytes. When the budget is
+    exceeded the least recently used steps are evicted: recomputable steps
+    are simply dropped and rebuilt from the nearest cached ancestor, other
+    steps are kept as lossless PNG bytes. The current step is never evicted.
+    """
+
+    def __init__(self, memory_budget=DEFAULT_BUDGET_MB * 2 ** 20, compress_evicted=False):
+        self.memory_budget = memory_budget
+        self.compress_evicted = compress_evicted
+        self.steps = []
+        self.position = -1
+        self.cache = OrderedDict()
+        self.cached_bytes = 0
+
+    def reset(self, img, label="Original Image"):
+        self.steps = []
+        self.position = -1
+        self.cache.clear()
+        self.cached_bytes = 0
+        self.push(label, img)
+
+    def push(self, label, img, function=None, args=()):
+        """Record img as the result of an operation on the current step.
+
+        Steps after the current position (the redo branch) are discarded, so
+        going back to step 3 and applying a different filter starts a new
+        branch from step 3's cached image.
+        """
+        parent = self.current_step
+        for step in self.steps[self.position + 1:]:
+            self._drop(step)
+        del self.steps[self.position + 1:]
+
+        step = HistoryStep(label, parent, function, args)
+        self.steps.append(step)
+        self.position = len(self.steps) - 1
+        self._store(step, img)
+        return img
+
+    def apply(self, label, function, *args):
+        """Run a deterministic operation on the current image and record it"""
+        return self.push(label, function(self.current_image, *args), function, args)
+
+    @property
+    def current_step(self):
+        return self.steps[self.position] if self.position >= 0 else None
+
+    @property
+    def current_image(self):
+        return self.image(self.position) if self.position >= 0 else None
+
+    @property
+    def can_undo(self):
+        return self.position > 0
+
+    @property
+    def can_redo(self):
+        return self.position < len(self.steps) - 1
+
+    def undo(self):
+        if self.can_undo:
+            return self.goto(self.position - 1)
+        return None
+
+    def redo(self):
+        if self.can_redo:
+            return self.goto(self.position + 1)
+        return None
+
+    def goto(self, index):
+        self.position = index
+        img = self.image(index)
+        self._evict()
+        return img
+
+    def labels(self):
+        return [step.label for step in self.steps]
+
+    def image(self, index):
+        """Decoded image of a step, restored or recomputed if it was evicted"""
+        step = self.steps[index]
+        img = self.cache.get(step)
+        if img is not None:
+            self.cache.move_to_end(step)
+            return img
+
+        if step.compressed is not None:
+            img = cv2.imdecode(np.frombuffer(step.compressed, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+        else:
+            img = step.function(self.image(index - 1), *step.args)
+        self._store(step, img)
+        return img
+
+    def summary(self):
+        return {
+            'steps': len(self.steps),
+            'position': self.position,
+            'cached_steps': len(self.cache),
+            'cached_bytes': self.cached_bytes,
+            'compressed_bytes': sum(len(step.compressed) for step in self.steps if step.compressed is not None)
+        }
+
+    def _store(self, step, img):
+        self.cache[step] = img
+        self.cache.move_to_end(step)
+        self.cached_bytes += img.nbytes
+        self._evict()
+
+    def _drop(self, step):
+        img = self.cache.pop(step, None)
+        if img is not None:
+            self.cached_bytes -= img.nbytes
+
+    def _evict(self):
+        current = self.current_step
+        for step in list(self.cache):
+            if self.cached_bytes <= self.memory_budget:
+                return
+            if step is current:
+                continue
+            if step.compressed is None and (self.compress_evicted or not step.recomputable):
+                ok, buffer = cv2.imencode(".png", self.cache[step])
+                if ok:
+                    step.compressed = buffer.tobytes()
+                elif not step.recomputable:
+                    continue
+            self._drop(step)
@@ -1,15 +1,28 @@
+import time
+STARTED = time.perf_counter()
+
 import cv2
 import numpy as np
-import matplotlib.pyplot as plt
-import random
 from tkinter import Tk, Button, Label, Frame, BOTH, LEFT, RIGHT, TOP, BOTTOM, filedialog, Scale, StringVar, OptionMenu
 from tkinter import ttk, Canvas, PhotoImage, HORIZONTAL, DISABLED, NORMAL, RIDGE, GROOVE, RAISED, SUNKEN
 from PIL import Image, ImageTk
 import os
 import sys
 
+# The operator library shared by Image Lab and Live Cam FX is the ../common package
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+import operations
+from display_proxy import DisplayProxy, read_preview
+from history import DEFAULT_BUDGET_MB, OperationHistory
+from histogram_panel import HistogramPanel, compute_histogram, equalization_lut, remap_histogram
+from preview import PREVIEWS, LivePreview
+from worker import OperationWorker, run_tiled
+
+NOISE_LABEL = "Salt & Pepper Noise"
+
 class ImageProcessingApp:
-    def __init__(self, root):
+    def __init__(self, root, history_budget_mb=DEFAULT_BUDGET_MB):
         self.root = root
         self.root.title("Image Processing Application")
         self.root.geometry("1200x750")
@@ -17,12 +30,21 @@ class ImageProcessingApp:
         
         # Initialize variables
         self.original_img = None
-        self.original_rgb = None
+        # Grayscale version of the original, computed the first time it is needed
         self.gray_img = None
         self.noisy_img = None
         self.current_img = None
         self.current_operation = "No Operation"
         self.brightness_value = 1.0
+        self.kernel_size = 3
+        self.tile_workers = os.cpu_count() or 1
+        
+        # Downscaled copies of recently shown images, newest first
+        self.display_proxies = []
+        self.display_size = 600
+        
+        # Undo/redo history with cached intermediate results
+        self.history = OperationHistory(memory_budget=history_budget_mb * 2 ** 20)
         
         # Create main frames
         self.create_frames()
@@ -36,6 +58,13 @@ class ImageProcessingApp:
         # Set theme colors
         self.set_theme()
         
+        # Operations run on a background thread so the window stays responsive
+        self.worker = OperationWorker(self.root, on_progress=self.update_progress)
+        
+        # Slider previews are rendered on the display proxy only
+        self.live_preview = LivePreview(self.root, self.show_preview)
+        self.preview_photo = None
+        
     def create_frames(self):
         # Main frame
         self.main_frame = Frame(self.root, bg="#f8f9fa")
@@ -70,32 +99,61 @@ class ImageProcessingApp:
         )
         if file_path:
             try:
-                self.original_img = cv2.imread(file_path)
-                if self.original_img is None:
-                    self.update_status("Failed to load image")
-                    return
-                    
-                self.original_rgb = cv2.cvtColor(self.original_img, cv2.COLOR_BGR2RGB)
-                self.gray_img = cv2.cvtColor(self.original_img, cv2.COLOR_BGR2GRAY)
+                self.worker.cancel()
+                self.original_img = None
+                self.gray_img = None
+                self.current_img = None
                 
-                self.display_image(self.original_img)
-                self.current_img = self.original_img.copy()
+                # The full decode is queued first so a failing preview never
+                # prevents it; the reduced decode is shown in the meantime
+                self.worker.submit("Loading", lambda job: cv2.imread(file_path),
+                                   lambda img: self.finish_loading(file_path, img), self.operation_failed)
+                self.update_status(f"Loading {os.path.basename(file_path)}...")
                 
-                self.update_status(f"Image loaded: {os.path.basename(file_path)}")
-                self.update_operation("Original Image")
+                preview = read_preview(file_path, self.display_size)
+                if preview is not None:
+                    self.display_image(preview)
+                    self.histogram_panel.show(preview, title="Preview")
             except Exception as e:
                 self.update_status(f"Error loading image: {str(e)}")
 
+    def finish_loading(self, file_path, img):
+        """Show the fully decoded image and start a new history"""
+        if img is None:
+            self.update_status("Failed to load image")
+            return
+        
+        self.original_img = img
+        self.display_image(self.original_img)
+        self.history.reset(self.original_img)
+        self.current_img = self.original_img
+        self.refresh_history_menu()
+        self.histogram_panel.show(self.original_img, title="Original Image")
+        
+        self.update_status(f"Image loaded: {os.path.basename(file_path)}")
+        self.update_operation("Original Image")
+
     def convert_to_grayscale(self):
         """Convert image to grayscale"""
         if self.original_img is None:
             self.update_status("Please load an image first")
             return
         
-        self.display_image(self.gray_img, is_grayscale=True)
-        self.current_img = self.gray_img.copy()
-        self.update_status("Image converted to grayscale")
-        self.update_operation("Grayscale")
+        if self.gray_img is not None:
+            self.display_image(self.gray_img, is_grayscale=True)
+            self.record_result("Grayscale", self.gray_img)
+            self.update_status("Image converted to grayscale")
+            self.update_operation("Grayscale")
+            return
+        
+        original_img = self.original_img
+        
+        def keep_gray_image(gray_img):
+            self.gray_img = gray_img
+        
+        self.run_operation("Grayscale", "Image converted to grayscale",
+                           lambda job: run_tiled(original_img, operations.as_grayscale, job),
+                           on_done=keep_gray_image)
 
     def add_watermark(self):
         """Add watermark to image"""
@@ -103,28 +161,9 @@ class ImageProcessingApp:
             self.update_status("Please load an image first")
             return
         
-        watermarked_img = self.current_img.copy()
-        
-        if len(watermarked_img.shape) == 3:
-            watermarked_img = cv2.cvtColor(watermarked_img, cv2.COLOR_BGR2GRAY)
-        
-        x_pos = random.randint(0, watermarked_img.shape[1] - 100)
-        y_pos = random.randint(50, watermarked_img.shape[0] - 10)
-        
-        cv2.putText(
-            watermarked_img, 
-            "Eman(12113148),Ibrahim(12112090)", 
-            (x_pos, y_pos), 
-            cv2.FONT_HERSHEY_SIMPLEX, 
-            0.7, 
-            255, 
-            2
-        )
-        
-        self.display_image(watermarked_img, is_grayscale=True)
-        self.current_img = watermarked_img.copy()
-        self.update_status("Watermark added")
-        self.update_operation("Watermark")
+        source_img = self.current_img
+        self.run_operation("Watermark", "Watermark added",
+                           lambda job: operations.add_watermark(source_img))
 
     def adjust_brightness(self):
         """Adjust image brightness"""
@@ -133,25 +172,21 @@ class ImageProcessingApp:
             return
         
         brightness_factor = self.brightness_value
+        source_img = self.current_img
         
-        if len(self.current_img.shape) == 3:
-            img_to_adjust = cv2.cvtColor(self.current_img, cv2.COLOR_BGR2GRAY)
-        else:
-            img_to_adjust = self.current_img.copy()
-        
-        bright_img = cv2.convertScaleAbs(img_to_adjust, alpha=brightness_factor, beta=0)
-        self.display_image(bright_img, is_grayscale=True)
-        self.current_img = bright_img.copy()
+        # Brightness is a point operation, so a grayscale input's histogram
+        # can be remapped instead of binning the result again
+        histogram = None
+        if len(source_img.shape) == 2:
+            histogram = remap_histogram(self.histogram_panel.histogram_of(source_img),
+                                        operations.brightness_lut(brightness_factor))
         
-        self.update_status(f"Brightness adjusted to {brightness_factor:.1f}")
-        self.update_operation(f"Brightness {brightness_factor:.1f}")
+        def work(job):
+            bright_img = run_tiled(source_img, lambda band: operations.adjust_brightness(band, brightness_factor), job)
+            return bright_img, histogram, None
         
-        plt.figure(figsize=(5, 3))
-        plt.title(f"Histogram after Brightness Adjustment ({brightness_factor:.1f})")
-        plt.hist(bright_img.ravel(), bins=256, range=[0, 256])
-        plt.grid()
-        plt.tight_layout()
-        plt.show()
+        self.run_operation(f"Brightness {brightness_factor:.1f}", f"Brightness adjusted to {brightness_factor:.1f}",
+                           work, operations.adjust_brightness, (brightness_factor,))
 
     def apply_equalization(self):
         """Apply histogram equalization"""
@@ -159,44 +194,24 @@ class ImageProcessingApp:
             self.update_status("Please load an image first")
             return
         
-        if len(self.current_img.shape) == 3:
-            img_to_equalize = cv2.cvtColor(self.current_img, cv2.COLOR_BGR2GRAY)
-        else:
-            img_to_equalize = self.current_img.copy()
-        
-        equalized_img = cv2.equalizeHist(img_to_equalize)
-        self.display_image(equalized_img, is_grayscale=True)
-        self.current_img = equalized_img.copy()
-        
-        self.update_status("Histogram equalization applied")
-        self.update_operation("Histogram Equalization")
-        
-        plt.figure(figsize=(12, 5))
-        
-        plt.subplot(2, 2, 1)
-        plt.title("Before Equalization")
-        plt.imshow(img_to_equalize, cmap='gray')
-        plt.axis('off')
-        
-        plt.subplot(2, 2, 3)
-        plt.title("Before Histogram")
-        plt.hist(img_to_equalize.ravel(), bins=256, range=[0, 256], color='b')
-        plt.xlim([0, 256])
-        plt.grid(True)
-        
-        plt.subplot(2, 2, 2)
-        plt.title("After Equalization")
-        plt.imshow(equalized_img, cmap='gray')
-        plt.axis('off')
-        
-        plt.subplot(2, 2, 4)
-        plt.title("After Histogram")
-        plt.hist(equalized_img.ravel(), bins=256, range=[0, 256], color='r')
-        plt.xlim([0, 256])
-        plt.grid(True)
-        
-        plt.tight_layout()
-        plt.show()
+        source_img = self.current_img
+        before_histogram = None
+        if len(source_img.shape) == 2:
+            before_histogram = self.histogram_panel.histogram_of(source_img)
+        
+        def work(job):
+            img_to_equalize = run_tiled(source_img, operations.as_grayscale, job, end=0.4)
+            histogram = before_histogram
+            if histogram is None:
+                histogram = compute_histogram(img_to_equalize)
+            # The equalized histogram follows from the input histogram alone,
+            # and the image is just that lookup table applied tile by tile
+            lut = equalization_lut(histogram[0])
+            equalized_img = run_tiled(img_to_equalize, lambda band: cv2.LUT(band, lut), job, start=0.5)
+            return equalized_img, remap_histogram(histogram, lut), histogram
+        
+        self.run_operation("Histogram Equalization", "Histogram equalization applied",
+                           work, operations.equalize_histogram)
 
     def add_salt_pepper_noise(self):
         """Add salt and pepper noise to image"""
@@ -204,24 +219,13 @@ class ImageProcessingApp:
             self.update_status("Please load an image first")
             return
         
-        if len(self.current_img.shape) == 3:
-            img_for_noise = cv2.cvtColor(self.current_img, cv2.COLOR_BGR2GRAY)
-        else:
-            img_for_noise = self.current_img.copy()
+        source_img = self.current_img
         
-        def apply_noise(img, noise_prob=0.02):
-            noisy_output = np.copy(img)
-            probabilities = np.random.rand(*img.shape)
-            noisy_output[probabilities < noise_prob] = 0
-            noisy_output[probabilities > 1 - noise_prob] = 255
-            return noisy_output
+        def keep_noisy_image(noisy_img):
+            self.noisy_img = noisy_img
         
-        self.noisy_img = apply_noise(img_for_noise)
-        self.display_image(self.noisy_img, is_grayscale=True)
-        self.current_img = self.noisy_img.copy()
-        
-        self.update_status("Salt & pepper noise added")
-        self.update_operation("Salt & Pepper Noise")
+        self.run_operation(NOISE_LABEL, "Salt & pepper noise added",
+                           lambda job: operations.add_salt_pepper_noise(source_img), on_done=keep_noisy_image)
 
     def apply_mean_filter(self):
         """Apply mean filter"""
@@ -229,12 +233,11 @@ class ImageProcessingApp:
             self.update_status("Please add noise first")
             return
         
-        filtered_img = cv2.blur(self.noisy_img, (3, 3))
-        self.display_image(filtered_img, is_grayscale=True)
-        self.current_img = filtered_img.copy()
-        
-        self.update_status("Mean filter applied")
-        self.update_operation("Mean Filter")
+        noisy_img = self.noisy_img
+        ksize = self.kernel_size
+        self.run_operation(f"Mean Filter {ksize}x{ksize}", "Mean filter applied",
+                           lambda job: run_tiled(noisy_img, lambda band: operations.mean_filter(band, ksize), job,
+                                                 halo=ksize // 2, workers=self.tile_workers))
 
     def apply_median_filter(self):
         """Apply median filter"""
@@ -242,12 +245,12 @@ class ImageProcessingApp:
             self.update_status("Please add noise first")
             return
         
-        filtered_img = cv2.medianBlur(self.noisy_img, 3)
-        self.display_image(filtered_img, is_grayscale=True)
-        self.current_img = filtered_img.copy()
-        
-        self.update_status("Median filter applied")
-        self.update_operation("Median Filter")
+        noisy_img = self.noisy_img
+        ksize = self.kernel_size
+        self.run_operation(f"Median Filter {ksize}x{ksize}", "Median filter applied",
+                           lambda job: run_tiled(noisy_img, lambda band: operations.median_filter(band, ksize), job,
+                                                 halo=ksize // 2, workers=self.tile_workers,
+                                                 min_band_pixels=operations.median_band_pixels(ksize)))
 
     def sharpen_image(self):
         """Apply sharpening filter"""
@@ -255,23 +258,10 @@ class ImageProcessingApp:
             self.update_status("Please load an image first")
             return
         
-        if len(self.current_img.shape) == 3:
-            img_to_sharpen = cv2.cvtColor(self.current_img, cv2.COLOR_BGR2GRAY)
-        else:
-            img_to_sharpen = self.current_img.copy()
-        
-        sharpening_kernel = np.array([
-            [0, -1, 0],
-            [-1, 5, -1],
-            [0, -1, 0]
-        ])
-        
-        sharpened_img = cv2.filter2D(img_to_sharpen, -1, sharpening_kernel)
-        self.display_image(sharpened_img, is_grayscale=True)
-        self.current_img = sharpened_img.copy()
-        
-        self.update_status("Sharpening filter applied")
-        self.update_operation("Sharpening Filter")
+        source_img = self.current_img
+        self.run_operation("Sharpening Filter", "Sharpening filter applied",
+                           lambda job: run_tiled(source_img, operations.sharpen, job, halo=1),
+                           operations.sharpen)
 
     def apply_gaussian_filter(self):
         """Apply Gaussian filter"""
@@ -279,35 +269,75 @@ class ImageProcessingApp:
             self.update_status("Please load an image first")
             return
         
-        if len(self.current_img.shape) == 3:
-            img_to_blur = cv2.cvtColor(self.current_img, cv2.COLOR_BGR2GRAY)
-        else:
-            img_to_blur = self.current_img.copy()
-        
-        blurred_img = cv2.GaussianBlur(img_to_blur, (5, 5), 0)
-        self.display_image(blurred_img, is_grayscale=True)
-        self.current_img = blurred_img.copy()
+        source_img = self.current_img
+        self.run_operation("Gaussian Filter", "Gaussian filter applied",
+                           lambda job: run_tiled(source_img, operations.gaussian_blur, job, halo=2),
+                           operations.gaussian_blur)
+
+    def run_operation(self, label, done_message, work, function=None, args=(), on_done=None):
+        """Run work(job) on the worker thread and show its result when done.
+        
+        work returns the new image, or (image, histogram, reference histogram).
+        A new operation supersedes one that is still running.
+        """
+        def finish(result):
+            if isinstance(result, tuple):
+                img, histogram, reference = result
+            else:
+                img, histogram, reference = result, None, None
+            if on_done is not None:
+                on_done(img)
+            
+            self.display_image(img, is_grayscale=True)
+            self.record_result(label, img, function, args, histogram, reference)
+            self.update_status(done_message)
+            self.update_operation(label)
         
-        self.update_status("Gaussian filter applied")
-        self.update_operation("Gaussian Filter")
+        self.worker.submit(label, work, finish, self.operation_failed)
+        self.update_status(f"{label}...")
+
+    def operation_failed(self, job, error):
+        self.update_status(f"{job.label} failed: {error}")
+
+    def cancel_operation(self, event=None):
+        """Cancel the running operation"""
+        job = self.worker.cancel()
+        if job is not None:
+            self.update_status(f"{job.label} cancelled")
+
+    def update_progress(self, job):
+        if job is None:
+            self.progress_bar["value"] = 0
+            self.cancel_button.config(state=DISABLED)
+        else:
+            self.progress_bar["value"] = job.fraction * 100
+            self.cancel_button.config(state=NORMAL)
+            self.status_var.set(f"{job.label}... {job.fraction:.0%}")
 
     def compare_images(self):
         """Compare original and processed images"""
-        if self.original_img is None or self.gray_img is None:
+        if self.original_img is None or self.current_img is None:
             self.update_status("Please load an image first")
             return
         
+        # matplotlib is only needed here, so it is imported on first use
+        import matplotlib.pyplot as plt
+        
+        # A 1000 px proxy is plenty for a 10x5 inch figure
+        original_preview = self.get_display_proxy(self.original_img).get(1000)
+        current_preview = self.get_display_proxy(self.current_img).get(1000)
+        
         plt.figure(figsize=(10, 5))
         plt.subplot(1, 2, 1)
-        plt.imshow(cv2.cvtColor(self.original_img, cv2.COLOR_BGR2RGB))
+        plt.imshow(cv2.cvtColor(original_preview, cv2.COLOR_BGR2RGB))
         plt.title("Original Image")
         plt.axis('off')
         
         plt.subplot(1, 2, 2)
-        if len(self.current_img.shape) == 3:
-            plt.imshow(cv2.cvtColor(self.current_img, cv2.COLOR_BGR2RGB))
+        if len(current_preview.shape) == 3:
+            plt.imshow(cv2.cvtColor(current_preview, cv2.COLOR_BGR2RGB))
         else:
-            plt.imshow(self.current_img, cmap="gray")
+            plt.imshow(current_preview, cmap="gray")
         plt.title("Processed Image")
         plt.axis('off')
         
@@ -316,30 +346,78 @@ class ImageProcessingApp:
         
         self.update_status("Comparing images")
 
+    def record_result(self, label, img, function=None, args=(), histogram=None, reference=None):
+        """Make img the current image and add it to the history"""
+        self.current_img = self.history.push(label, img, function, args)
+        self.refresh_history_menu()
+        self.histogram_panel.show(img, histogram, reference, title=label)
+
+    def undo(self, event=None):
+        """Go back one step in the history"""
+        if not self.history.can_undo:
+            self.update_status("Nothing to undo")
+            return
+        self.show_history_step(self.history.position - 1)
+
+    def redo(self, event=None):
+        """Go forward one step in the history"""
+        if not self.history.can_redo:
+            self.update_status("Nothing to redo")
+            return
+        self.show_history_step(self.history.position + 1)
+
+    def show_history_step(self, index):
+        """Display a history step; new operations branch from here"""
+        self.worker.cancel()
+        self.current_img = self.history.goto(index)
+        self.noisy_img = self.noisy_image_at(index)
+        self.display_image(self.current_img)
+        
+        label = self.history.current_step.label
+        self.update_status(f"History step {index + 1}: {label}")
+        self.update_operation(label)
+        self.refresh_history_menu()
+        self.histogram_panel.show(self.current_img, title=label)
+
+    def noisy_image_at(self, index):
+        """Result of the last noise step up to history step index, if any"""
+        for step_index in range(index, -1, -1):
+            if self.history.steps[step_index].label == NOISE_LABEL:
+                return self.history.image(step_index)
+        return None
+
+    def refresh_history_menu(self):
+        menu = self.history_menu["menu"]
+        menu.delete(0, "end")
+        for index, label in enumerate(self.history.labels()):
+            menu.add_command(label=f"{index + 1}. {label}",
+                             command=lambda index=index: self.show_history_step(index))
+        if self.history.current_step is not None:
+            self.history_var.set(f"{self.history.position + 1}. {self.history.current_step.label}")
+
     def display_image(self, img, is_grayscale=False):
         """Display the image in the UI"""
+        self.live_preview.cancel()
         if self.placeholder_text.winfo_exists():
             self.placeholder_text.pack_forget()
             
-        img = self.resize_image(img.copy())
-        
-        if not is_grayscale and len(img.shape) == 3:
-            img_display = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        else:
-            img_display = img
-            
-        img_pil = Image.fromarray(img_display)
-        img_tk = ImageTk.PhotoImage(img_pil)
+        img_tk = self.get_display_proxy(img).photo(self.display_size, is_grayscale)
         self.image_panel.config(image=img_tk)
         self.image_panel.image = img_tk
 
-    def resize_image(self, img, max_size=600):
-        """Resize the image while maintaining aspect ratio if it exceeds max_size"""
-        height, width = img.shape[:2]
-        scale = min(max_size / width, max_size / height, 1.0)
-        if scale < 1.0:
-            img = cv2.resize(img, (int(width * scale), int(height * scale)))
-        return img
+    def get_display_proxy(self, img, max_proxies=3):
+        """Return the cached display proxy of img, creating it on first use"""
+        for proxy in self.display_proxies:
+            if proxy.source is img:
+                return proxy
+        
+        proxy = DisplayProxy(img)
+        # Always keep the original's proxy, it is needed again for comparisons
+        kept = [p for p in self.display_proxies if p.source is self.original_img][:1]
+        # Proxies of images that are gone (e.g. evicted from history) are dropped
+        others = [p for p in self.display_proxies if p.source is not None and p.source is not self.original_img]
+        self.display_proxies = [proxy] + kept + others[:max_proxies - 1 - len(kept)]
+        return proxy
 
     def update_status(self, message):
         self.status_var.set(message)
@@ -349,8 +427,31 @@ class ImageProcessingApp:
         self.current_operation = operation
         self.operation_var.set(f"Current Operation: {operation}")
     
+    def update_kernel_size(self, val):
+        self.kernel_size = int(val)
+
     def update_brightness(self, val):
         self.brightness_value = float(val)
+        self.preview_operation('brightness', self.brightness_value)
+
+    def preview_operation(self, name, value):
+        """Show operation name with value applied to the current display proxy"""
+        if self.current_img is None:
+            return
+        proxy = self.get_display_proxy(self.current_img).get(self.display_size)
+        self.live_preview.request(PREVIEWS[name], proxy, value)
+
+    def show_preview(self, img):
+        """Display a screen-sized preview, reusing the Tk image when possible"""
+        img_pil = Image.fromarray(img if len(img.shape) == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+        photo = self.preview_photo
+        if photo is None or (photo.width(), photo.height()) != img_pil.size:
+            photo = ImageTk.PhotoImage(img_pil)
+            self.preview_photo = photo
+        else:
+            photo.paste(img_pil)
+        self.image_panel.config(image=photo)
+        self.image_panel.image = photo
 
     def create_ui_elements(self):
         # Application title
@@ -404,6 +505,21 @@ class ImageProcessingApp:
         
         # Filter buttons
         self.create_button(self.filter_controls, "Add Salt & Pepper Noise", self.add_salt_pepper_noise, "#7209b7")
+        
+        # Kernel size for the mean and median filters
+        kernel_frame = Frame(self.filter_controls, bg="#ffffff")
+        kernel_frame.pack(fill="x", pady=3)
+        
+        kernel_label = Label(kernel_frame, text="Kernel size:", bg="#ffffff")
+        kernel_label.pack(side=LEFT)
+        
+        self.kernel_var = StringVar()
+        self.kernel_var.set(str(self.kernel_size))
+        kernel_menu = OptionMenu(kernel_frame, self.kernel_var, *[str(k) for k in operations.KERNEL_SIZES],
+                                 command=self.update_kernel_size)
+        kernel_menu.config(bg="#ffffff", highlightthickness=0)
+        kernel_menu.pack(side=RIGHT)
+        
         self.create_button(self.filter_controls, "Apply Mean Filter", self.apply_mean_filter, "#560bad")
         self.create_button(self.filter_controls, "Apply Median Filter", self.apply_median_filter, "#480ca8")
         self.create_button(self.filter_controls, "Apply Sharpening Filter", self.sharpen_image, "#3a0ca3")
@@ -420,6 +536,32 @@ class ImageProcessingApp:
         self.create_button_small(self.advanced_controls, "Histogram Equalization", self.apply_equalization, "#4895ef")
         self.create_button_small(self.advanced_controls, "Compare Images", self.compare_images, "#4cc9f0")
         
+        # History controls
+        history_frame = Frame(self.advanced_controls, bg="#ffffff")
+        history_frame.pack(fill="x", pady=5)
+        
+        history_label = Label(history_frame, text="History:", bg="#ffffff")
+        history_label.pack(side=LEFT)
+        
+        self.history_var = StringVar()
+        self.history_var.set("No steps")
+        self.history_menu = OptionMenu(history_frame, self.history_var, "No steps")
+        self.history_menu.config(bg="#ffffff", highlightthickness=0)
+        self.history_menu.pack(side=RIGHT, fill="x", expand=True)
+        
+        self.create_button_small(self.advanced_controls, "Undo", self.undo, "#6c757d")
+        self.create_button_small(self.advanced_controls, "Redo", self.redo, "#6c757d")
+        self.root.bind("<Control-z>", self.undo)
+        self.root.bind("<Control-y>", self.redo)
+        
+        # Histogram of the current image
+        histogram_title = Label(self.advanced_controls, text="Histogram", 
+                               font=("Arial", 12, "bold"), bg="#ffffff", fg="#4361ee")
+        histogram_title.pack(anchor="w", pady=(5, 3))
+        
+        self.histogram_panel = HistogramPanel(self.advanced_controls)
+        self.histogram_panel.pack(fill="x", pady=3)
+        
         # Developer information
         dev_frame = Frame(self.control_frame, bg="#e9ecef", bd=1, relief=GROOVE)
         dev_frame.pack(fill="x", side=BOTTOM, padx=10, pady=10)
@@ -455,6 +597,15 @@ class ImageProcessingApp:
                                     font=("Arial", 9), bg="#4361ee", fg="white", anchor="e")
         self.operation_label.pack(side=RIGHT, padx=10)
         
+        # Progress of the background operation
+        self.cancel_button = Button(self.status_frame, text="Cancel", command=self.cancel_operation,
+                                    font=("Arial", 8), relief=RAISED, borderwidth=1, state=DISABLED)
+        self.cancel_button.pack(side=RIGHT, padx=5)
+        
+        self.progress_bar = ttk.Progressbar(self.status_frame, orient=HORIZONTAL, length=150, maximum=100)
+        self.progress_bar.pack(side=RIGHT, padx=5)
+        self.root.bind("<Escape>", self.cancel_operation)
+        
     def set_theme(self):
         # Set button style
         style = ttk.Style()
@@ -475,4 +626,12 @@ class ImageProcessingApp:
 if __name__ == "__main__":
     root = Tk()
     app = ImageProcessingApp(root)
+    
+    if "--startup-time" in sys.argv:
+        # Report the time until the window is idle, then quit
+        def report_startup():
+            print(f"Startup time: {(time.perf_counter() - STARTED) * 1000:.1f} ms")
+            root.destroy()
+        root.after_idle(report_startup)
+    
     root.mainloop()
@@ -0,0 +1,237 @@
+import random
+
+import cv2
+import numpy as np
+
+from common import imageops
+
+WATERMARK_TEXT = "Eman(12113148),Ibrahim(12112090)"
+
+
+def as_grayscale(img):
+    """Return a single-channel version of img (a copy if it already is one)"""
+    return imageops.to_gray(img)
+
+
+def to_grayscale(img):
+    """Convert image to grayscale"""
+    return as_grayscale(img)
+
+
+def adjust_brightness(img, factor=1.0):
+    """Scale pixel values by factor (on the grayscale image)"""
+    return cv2.convertScaleAbs(as_grayscale(img), alpha=factor, beta=0)
+
+
+def brightness_lut(factor):
+    """Lookup table equivalent to adjust_brightness on grayscale pixels"""
+    # Run OpenCV on the 256 levels themselves so rounding matches exactly
+    levels = np.arange(256, dtype=np.uint8).reshape(1, -1)
+    return cv2.convertScaleAbs(levels, alpha=factor, beta=0).ravel()
+
+
+def equalize_histogram(img):
+    """Apply histogram equalization"""
+    return cv2.equalizeHist(as_grayscale(img))
+
+
+def add_salt_pepper_noise(img, density=0.04, seed=None, salt_ratio=0.5, color=False, in_place=False,
+                          chunk_size=1 << 20):
+    """Add salt and pepper noise to image.
+
+    density is the expected fraction of corrupted pixels, salt_ratio the
+    share of them set to white. Only the corrupted pixel indices are drawn
+    (in chunks), so memory stays proportional to the noise, not the image.
+    Colour images keep their channels with color=True and get whole pixels
+    set to black or white; otherwise they are converted to grayscale first.
+    """
+    if color or len(img.shape) == 2:
+        noisy_output = img if in_place else img.copy()
+    else:
+        noisy_output = as_grayscale(img)
+
+    channels = 1 if noisy_output.ndim == 2 else noisy_output.shape[2]
+    pixels = noisy_output.reshape(-1, channels)
+    if not np.shares_memory(pixels, noisy_output):
+        raise ValueError("in-place noise needs a contiguous image")
+
+    rng = np.random.default_rng(seed)
+    pixel_count = pixels.shape[0]
+    # Indices are drawn with replacement; draw enough that the expected
+    # fraction of distinct pixels hit equals density
+    draws = int(round(-pixel_count * np.log1p(-min(density, 0.999999))))
+    salt_draws = rng.binomial(draws, salt_ratio)
+
+    for value, count in ((255, salt_draws), (0, draws - salt_draws)):
+        for start in range(0, count, chunk_size):
+            indices = rng.integers(0, pixel_count, size=min(chunk_size, count - start))
+            pixels[indices] = value
+    return noisy_output
+
+
+KERNEL_SIZES = tuple(range(3, 22, 2))
+
+
+def check_kernel_size(ksize):
+    if ksize not in KERNEL_SIZES:
+        raise ValueError(f"Kernel size must be an odd number from {KERNEL_SIZES[0]} to {KERNEL_SIZES[-1]}, got {ksize}")
+
+
+def check_gaussian_size(ksize):
+    if ksize < 1 or ksize % 2 == 0:
+        raise ValueError(f"Kernel size must be an odd number >= 1, got {ksize}")
+
+
+def check_density(density):
+    if not 0 <= density < 1:
+        raise ValueError(f"Noise density must be in [0, 1), got {density}")
+
+
+def check_factor(factor):
+    if factor < 0:
+        raise ValueError(f"Brightness factor must be >= 0, got {factor}")
+
+
+def mean_filter(img, ksize=3):
+    """Apply mean filter.
+
+    imageops.box_blur (cv2.blur) keeps running column sums (the separable
+    form of an integral image), so the cost per pixel does not grow with ksize.
+    """
+    check_kernel_size(ksize)
+    return imageops.box_blur(img, ksize)
+
+
+def median_filter(img, ksize=3):
+    """Apply median filter.
+
+    For 8-bit images of about 4 MP and up with ksize > 5, imageops.median_blur
+    (cv2.medianBlur) uses the constant-time histogram algorithm, so large
+    kernels cost about the same as 7x7; see median_band_pixels for tiling.
+    """
+    check_kernel_size(ksize)
+    return imageops.median_blur(img, ksize)
+
+
+# cv2.medianBlur only takes its constant-time path for ksize > 5 on images of
+# at least this many pixels, so tiled median bands must not be smaller
+MEDIAN_CONSTANT_TIME_PIXELS = 4 * 2 ** 20
+
+
+def median_band_pixels(ksize):
+    """Smallest band run_tiled may give median_filter without slowing it down"""
+    return MEDIAN_CONSTANT_TIME_PIXELS if ksize > 5 else 0
+
+
+def sharpen(img):
+    """Apply sharpening filter"""
+    gray = as_grayscale(img)
+    return imageops.sharpen(gray, dst=gray)
+
+
+def gaussian_blur(img, ksize=5):
+    """Apply Gaussian filter"""
+    gray = as_grayscale(img)
+    return imageops.gaussian_blur(gray, ksize, dst=gray)
+
+
+def add_watermark(img, text=WATERMARK_TEXT, seed=None):
+    """Add watermark text at a random position"""
+    watermarked_img = as_grayscale(img)
+
+    rng = random.Random(seed)
+    x_pos = rng.randint(0, max(0, watermarked_img.shape[1] - 100))
+    y_pos = rng.randint(50, max(50, watermarked_img.shape[0] - 10))
+
+    cv2.putText(
+        watermarked_img,
+        text,
+        (x_pos, y_pos),
+        cv2.FONT_HERSHEY_SIMPLEX,
+        0.7,
+        255,
+        2
+    )
+    return watermarked_img
+
+
+# Operation name -> (function, type of the optional argument)
+OPERATIONS = {
+    'grayscale': (to_grayscale, None),
+    'brightness': (adjust_brightness, float),
+    'equalize': (equalize_histogram, None),
+    'noise': (add_salt_pepper_noise, float),
+    'mean': (mean_filter, int),
+    'median': (median_filter, int),
+    'sharpen': (sharpen, None),
+    'gaussian': (gaussian_blur, int),
+    'watermark': (add_watermark, str)
+}
+
+# Operations that draw random numbers and take a seed keyword
+SEEDED_OPERATIONS = {'noise', 'watermark'}
+
+# Operation name -> check raising ValueError for an out-of-range argument
+ARGUMENT_CHECKS = {
+    'brightness': check_factor,
+    'noise': check_density,
+    'mean': check_kernel_size,
+    'median': check_kernel_size,
+    'gaussian': check_gaussian_size
+}
+
+
+def parse_chain(spec):
+    """Parse "grayscale,brightness:1.5,median:5" into [(name, args), ...].
+
+    Arguments are converted and range-checked here, so a bad chain fails
+    before any image is read; errors name the offending step.
+    """
+    chain = []
+    for step in spec.split(","):
+        step = step.strip()
+        if not step:
+            continue
+        name, _, argument = step.partition(":")
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{name}', expected one of: {', '.join(OPERATIONS)}")
+
+        _, argument_type = OPERATIONS[name]
+        if argument and argument_type is None:
+            raise ValueError(f"Operation '{name}' takes no argument")
+        if not argument:
+            chain.append((name, ()))
+            continue
+
+        try:
+            value = argument_type(argument)
+        except ValueError:
+            raise ValueError(f"Invalid step '{step}': '{argument}' is not a valid {argument_type.__name__}") from None
+        check = ARGUMENT_CHECKS.get(name)
+        if check is not None:
+            try:
+                check(value)
+            except ValueError as e:
+                raise ValueError(f"Invalid step '{step}': {e}") from None
+        chain.append((name, (value,)))
+    return chain
+
+
+def step_seed(seed, position):
+    """Independent seed for the step at position in a chain run with seed"""
+    return int(np.random.SeedSequence([seed, position]).generate_state(1)[0])
+
+
+def apply_chain(img, chain, seed=None):
+    """Apply a parsed operation chain to img.
+
+    With a seed, every random step gets its own seed derived from it, so the
+    same chain on the same image always gives the same result.
+    """
+    for position, (name, args) in enumerate(chain):
+        function, _ = OPERATIONS[name]
+        if seed is not None and name in SEEDED_OPERATIONS:
+            img = function(img, *args, seed=step_seed(seed, position))
+        else:
+            img = function(img, *args)
+    return img
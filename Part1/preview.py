@@ -0,0 +1,63 @@
+import cv2
+
+import operations
+
+
+class PreviewOperation:
+    """How to preview a parameterised operation on a display proxy.
+
+    prepare(proxy) runs once per proxy (e.g. the grayscale conversion) and
+    render(prepared, value) runs for every new parameter value, so it should
+    be cheap: a lookup table or a small filter on a screen-sized image.
+    """
+
+    def __init__(self, prepare, render):
+        self.prepare = prepare
+        self.render = render
+
+
+PREVIEWS = {
+    'brightness': PreviewOperation(
+        operations.as_grayscale,
+        lambda img, factor: cv2.LUT(img, operations.brightness_lut(factor))
+    )
+}
+
+
+class LivePreview:
+    """Renders previews while a slider moves, at most once per idle cycle.
+
+    Slider events arriving before the previous preview was drawn only
+    replace the pending value, so dragging never queues up work.
+    """
+
+    def __init__(self, root, show):
+        self.root = root
+        self.show = show
+        self.pending = None
+        self.prepared = {}
+
+    def request(self, operation, proxy, value):
+        first_request = self.pending is None
+        self.pending = (operation, proxy, value)
+        if first_request:
+            self.root.after_idle(self._render)
+
+    def cancel(self):
+        self.pending = None
+
+    def clear(self):
+        self.pending = None
+        self.prepared.clear()
+
+    def _render(self):
+        if self.pending is None:
+            return
+        operation, proxy, value = self.pending
+        self.pending = None
+
+        cached = self.prepared.get(operation)
+        if cached is None or cached[0] is not proxy:
+            cached = (proxy, operation.prepare(proxy))
+            self.prepared[operation] = cached
+        self.show(operation.render(cached[1], value))
@@ -0,0 +1,209 @@
+import queue
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+
+# Rows per tile are chosen so that one tile is roughly this many bytes
+TILE_BYTES = 4 * 2 ** 20
+
+
+class OperationCancelled(Exception):
+    pass
+
+
+class Job:
+    """One operation submitted to the worker"""
+
+    def __init__(self, label, work, on_done, on_error=None):
+        self.label = label
+        self.work = work
+        self.on_done = on_done
+        self.on_error = on_error
+        self.fraction = 0.0
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def progress(self, fraction):
+        """Report progress; raises OperationCancelled once the job is cancelled"""
+        if self.cancelled:
+            raise OperationCancelled()
+        self.fraction = fraction
+
+
+def run_tiled(img, function, job=None, halo=0, tile_rows=None, start=0.0, end=1.0, workers=1,
+              min_band_pixels=0):
+    """Apply function to horizontal bands of img and stitch the results.
+
+    halo extra rows are passed above and below every band (use the kernel
+    radius for neighbourhood filters) so the stitched result matches a single
+    full-image call. Progress from start to end is reported to job after each
+    band, which is also where a cancelled job stops. With workers > 1 the
+    bands are processed by a thread pool; OpenCV releases the GIL, so this
+    spreads single-threaded OpenCV functions across cores. min_band_pixels
+    keeps every band at least that large (fewer, evenly sized bands) for
+    functions whose algorithm depends on the input size.
+    """
+    height = img.shape[0]
+    if tile_rows is None:
+        row_bytes = max(1, img.nbytes // max(1, height))
+        tile_rows = max(16, TILE_BYTES // row_bytes)
+        if workers > 1:
+            # At least two bands per worker so every core gets work
+            tile_rows = max(16, min(tile_rows, -(-height // (2 * workers))))
+    tiles = [(top, min(top + tile_rows, height)) for top in range(0, height, tile_rows)]
+    if min_band_pixels:
+        width = max(1, img.shape[1])
+        count = max(1, min(len(tiles), height * width // min_band_pixels))
+        bounds = [height * index // count for index in range(count + 1)]
+        tiles = list(zip(bounds[:-1], bounds[1:]))
+
+    def process(tile):
+        top, bottom = tile
+        band_top = max(0, top - halo)
+        band_bottom = min(height, bottom + halo)
+        return function(img[band_top:band_bottom])[top - band_top:bottom - band_top]
+
+    def report(rows_done):
+        if job is not None:
+            job.progress(start + (end - start) * rows_done / height)
+
+    # The first band also tells the output shape and dtype
+    first = process(tiles[0])
+    out = np.empty((height,) + first.shape[1:], dtype=first.dtype)
+    out[:tiles[0][1]] = first
+    rows_done = tiles[0][1]
+    report(rows_done)
+
+    if workers <= 1:
+        for top, bottom in tiles[1:]:
+            out[top:bottom] = process((top, bottom))
+            rows_done += bottom - top
+            report(rows_done)
+        return out
+
+    def process_into(tile):
+        out[tile[0]:tile[1]] = process(tile)
+        return tile
+
+    with ThreadPoolExecutor(workers, thread_name_prefix="tile") as executor:
+        futures = [executor.submit(process_into, tile) for tile in tiles[1:]]
+        try:
+            for future in as_completed(futures):
+                top, bottom = future.result()
+                rows_done += bottom - top
+                report(rows_done)
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+    return out
+
+
+class OperationWorker:
+    """Runs Image Lab operations on a background thread.
+
+    Only one job runs at a time. Submitting a new job cancels the running one
+    and replaces any job still waiting, so a burst of clicks only computes the
+    last request. Results and progress are handed back to the Tk thread by
+    polling with root.after, since Tk must not be touched from the worker.
+    """
+
+    def __init__(self, root, on_progress=None, poll_ms=50):
+        self.root = root
+        self.on_progress = on_progress
+        self.poll_ms = poll_ms
+
+        self.condition = threading.Condition()
+        self.pending_job = None
+        self.running_job = None
+        self.latest_job = None
+        self.results = queue.Queue()
+        self.polling = False
+
+        self.thread = threading.Thread(target=self._run, name="image-operations")
+        self.thread.daemon = True
+        self.thread.start()
+
+    @property
+    def busy(self):
+        with self.condition:
+            return self.pending_job is not None or self.running_job is not None
+
+    def submit(self, label, work, on_done, on_error=None):
+        """Queue work(job); on_done(result) is later called on the Tk thread"""
+        job = Job(label, work, on_done, on_error)
+        with self.condition:
+            if self.running_job is not None:
+                self.running_job.cancel()
+            self.pending_job = job
+            self.latest_job = job
+            self.condition.notify()
+
+        if not self.polling:
+            self.polling = True
+            self.root.after(self.poll_ms, self._poll)
+        return job
+
+    def cancel(self):
+        """Cancel the running and pending jobs; returns the cancelled job, if any"""
+        with self.condition:
+            job = self.running_job or self.pending_job
+            if self.running_job is not None:
+                self.running_job.cancel()
+            self.pending_job = None
+            self.latest_job = None
+        return job
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while self.pending_job is None:
+                    self.condition.wait()
+                job = self.pending_job
+                self.pending_job = None
+                self.running_job = job
+
+            try:
+                result = job.work(job)
+                self.results.put((job, result, None))
+            except OperationCancelled:
+                pass
+            except Exception as e:
+                self.results.put((job, None, e))
+            finally:
+                with self.condition:
+                    self.running_job = None
+
+    def _poll(self):
+        try:
+            while True:
+                try:
+                    job, result, error = self.results.get_nowait()
+                except queue.Empty:
+                    break
+                # Results of superseded or cancelled jobs are dropped
+                if job is not self.latest_job or job.cancelled:
+                    continue
+                self.latest_job = None
+                try:
+                    if error is None:
+                        job.on_done(result)
+                    elif job.on_error is not None:
+                        job.on_error(job, error)
+                except Exception:
+                    # A failing callback must not stop the polling loop
+                    traceback.print_exc()
+
+            with self.condition:
+                job = self.running_job
+            if self.on_progress is not None:
+                self.on_progress(job)
+        finally:
+            if self.busy or not self.results.empty():
+                self.root.after(self.poll_ms, self._poll)
+            else:
+                self.polling = False
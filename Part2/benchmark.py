@@ -0,0 +1,201 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+# The operator library shared by Image Lab and Live Cam FX is the ../common package
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from video_engine import VideoEngine, TRANSITION_TYPES
+from synthetic import synthetic_clip, load_clip
+
+FILTER_INDICES = range(20)
+
+# Transitions are measured between these two filters
+TRANSITION_FROM_FILTER = 0
+TRANSITION_TO_FILTER = 5
+
+MEMORY_SAMPLE_FRAMES = 10
+
+
+def build_scenarios(filters=None, transitions=None):
+    """All filters and transitions, or only the ones explicitly selected."""
+    if filters is None and transitions is None:
+        filters, transitions = FILTER_INDICES, sorted(TRANSITION_TYPES)
+
+    scenarios = []
+    for filter_index in filters or ():
+        scenarios.append((f"filter[{filter_index}]", filter_index, None))
+    for transition_type in transitions or ():
+        scenarios.append((f"transition[{transition_type}]", TRANSITION_TO_FILTER, transition_type))
+    return scenarios
+
+
+def make_engine(filter_index, transition_type, processing_width):
+    engine = VideoEngine(processing_width=processing_width)
+    if transition_type is None:
+        engine.set_filter(filter_index, animate=False)
+    else:
+        engine.set_filter(TRANSITION_FROM_FILTER, animate=False)
+        engine.set_transition_type(transition_type)
+        engine.set_filter(filter_index)
+    return engine
+
+
+def replay(engine, frames, transition_type):
+    """Push every frame through the engine and return per-frame times (ms).
+
+    Transitions are driven by wall-clock time inside the engine; to make the
+    replay deterministic the start time is rewound so that frame i is always
+    rendered at progress i / len(frames).
+    """
+    frame_times = np.empty(len(frames), dtype=np.float64)
+    for index, frame in enumerate(frames):
+        if transition_type is not None:
+            transition = engine.transition
+            transition.is_transitioning = True
+            progress = index / len(frames)
+            transition.transition_start_time = time.time() - progress * transition.transition_time
+
+        start_time = time.perf_counter()
+        engine.process_frame(frame)
+        frame_times[index] = (time.perf_counter() - start_time) * 1000.0
+    return frame_times
+
+
+def peak_memory(filter_index, transition_type, frames, processing_width):
+    engine = make_engine(filter_index, transition_type, processing_width)
+    replay(engine, frames[:2], transition_type)
+
+    tracemalloc.start()
+    try:
+        replay(engine, frames[:MEMORY_SAMPLE_FRAMES], transition_type)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def run_scenario(filter_index, transition_type, frames, processing_width, warmup):
+    engine = make_engine(filter_index, transition_type, processing_width)
+    replay(engine, frames[:warmup], transition_type)
+
+    frame_times = replay(engine, frames, transition_type)
+    total_ms = float(frame_times.sum())
+    p50, p95, p99 = np.percentile(frame_times, (50, 95, 99))
+
+    return {
+        'frames': len(frames),
+        'fps': len(frames) / (total_ms / 1000.0) if total_ms > 0 else 0.0,
+        'mean_ms': float(frame_times.mean()),
+        'p50_ms': float(p50),
+        'p95_ms': float(p95),
+        'p99_ms': float(p99),
+        'peak_memory_bytes': peak_memory(filter_index, transition_type, frames, processing_width)
+    }
+
+
+# (result key, label, format, unit, higher is better)
+SCENARIO_METRICS = (
+    ('fps', "FPS", ".1f", "", True),
+    ('p95_ms', "p95", ".2f", " ms", False),
+    ('peak_memory_bytes', "peak memory", "d", " B", False)
+)
+
+
+def compare_to_baseline(results, baseline, tolerance, metrics=SCENARIO_METRICS):
+    """Return a list of human-readable regressions."""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get('results', {}).get(name)
+        if reference is None:
+            continue
+        for key, label, number_format, unit, higher_is_better in metrics:
+            value, expected = result[key], reference[key]
+            if higher_is_better:
+                regressed = value < expected * (1.0 - tolerance)
+            else:
+                regressed = value > expected * (1.0 + tolerance)
+            if regressed:
+                regressions.append(f"{name}: {label} {value:{number_format}}{unit} "
+                                   f"{'<' if higher_is_better else '>'} baseline {expected:{number_format}}{unit}")
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Replay a clip through every live filter and transition")
+    parser.add_argument("--clip", help="Video file to replay (default: synthetic clip with faces)")
+    parser.add_argument("--frames", type=int, default=120, help="Frames per scenario")
+    parser.add_argument("--width", type=int, default=640, help="Synthetic clip width")
+    parser.add_argument("--height", type=int, default=480, help="Synthetic clip height")
+    parser.add_argument("--faces", type=int, default=1, help="Faces in the synthetic clip")
+    parser.add_argument("--processing-width", type=int, default=480)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--filter", type=int, action="append", dest="filters",
+                        help="Only benchmark this filter index; repeatable")
+    parser.add_argument("--transition", action="append", dest="transitions", choices=sorted(TRANSITION_TYPES),
+                        help="Only benchmark this transition; repeatable")
+    parser.add_argument("--output", help="Write results as JSON")
+    parser.add_argument("--baseline", help="Compare against a previous --output file")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative regression (default 0.15)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 on regressions")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    if args.clip:
+        frames = load_clip(args.clip, args.frames)
+        source = args.clip
+    else:
+        frames = synthetic_clip(args.frames, args.width, args.height, args.faces)
+        source = f"synthetic {args.width}x{args.height}, {args.faces} face(s)"
+    if not frames:
+        raise SystemExit("No frames to replay")
+
+    scenarios = build_scenarios(args.filters, args.transitions)
+
+    results = {}
+    for name, filter_index, transition_type in scenarios:
+        result = run_scenario(filter_index, transition_type, frames, args.processing_width, args.warmup)
+        results[name] = result
+        print(f"{name:<22} {result['fps']:8.1f} FPS  p50 {result['p50_ms']:7.2f}  p95 {result['p95_ms']:7.2f}  "
+              f"p99 {result['p99_ms']:7.2f} ms  peak {result['peak_memory_bytes'] / 1e6:6.2f} MB")
+
+    report = {
+        'meta': {
+            'source': source,
+            'frames': len(frames),
+            'processing_width': args.processing_width,
+            'python': platform.python_version(),
+            'opencv': cv2.__version__,
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S")
+        },
+        'results': results
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import cv2
+
+FOURCC_CODES = ("MJPG", "YUYV")
+
+
+class CaptureSettings:
+    """Requested camera mode. None means "leave the driver default"."""
+
+    def __init__(self, device=0, width=None, height=None, fps=None, fourcc=None, buffer_size=None):
+        if fourcc is not None and fourcc not in FOURCC_CODES:
+            raise ValueError(f"Unsupported fourcc {fourcc!r}, expected one of {FOURCC_CODES}")
+
+        self.device = device
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.fourcc = fourcc
+        self.buffer_size = buffer_size
+
+
+def open_capture(settings=None):
+    if settings is None:
+        settings = CaptureSettings()
+
+    cap = cv2.VideoCapture(settings.device)
+    if not cap.isOpened():
+        return cap
+
+    # The pixel format has to be negotiated before the frame size: many UVC
+    # drivers only expose high resolutions / frame rates in MJPG.
+    if settings.fourcc is not None:
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*settings.fourcc))
+    if settings.width is not None:
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, settings.width)
+    if settings.height is not None:
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, settings.height)
+    if settings.fps is not None:
+        cap.set(cv2.CAP_PROP_FPS, settings.fps)
+    if settings.buffer_size is not None:
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, settings.buffer_size)
+
+    return cap
+
+
+def describe_capture(cap):
+    """Return the mode the driver actually agreed to."""
+    fourcc_value = int(cap.get(cv2.CAP_PROP_FOURCC))
+    fourcc = "".join(chr((fourcc_value >> (8 * i)) & 0xFF) for i in range(4)).strip("\x00")
+
+    return {
+        'width': int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        'height': int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        'fps': cap.get(cv2.CAP_PROP_FPS),
+        'fourcc': fourcc,
+        'buffer_size': int(cap.get(cv2.CAP_PROP_BUFFERSIZE))
+    }
+
+
+def add_capture_arguments(parser):
+    group = parser.add_argument_group("capture and processing")
+    group.add_argument("--camera", type=int, default=0, help="Camera device index")
+    group.add_argument("--capture-width", type=int, default=None)
+    group.add_argument("--capture-height", type=int, default=None)
+    group.add_argument("--capture-fps", type=float, default=None)
+    group.add_argument("--fourcc", choices=FOURCC_CODES, default=None)
+    group.add_argument("--buffer-size", type=int, default=None)
+    group.add_argument("--processing-width", type=int, default=480,
+                       help="Width frames are downscaled to before filtering (aspect ratio is kept)")
+    group.add_argument("--target-frame-ms", type=float, default=None,
+                       help="Enable adaptive quality with this per-frame processing budget")
+    group.add_argument("--static-threshold", type=float, default=None,
+                       help="Reuse the previous output while the scene changes less than this "
+                            "(grey levels per thumbnail cell)")
+    return group
+
+
+def settings_from_args(args):
+    return CaptureSettings(
+        device=args.camera,
+        width=args.capture_width,
+        height=args.capture_height,
+        fps=args.capture_fps,
+        fourcc=args.fourcc,
+        buffer_size=args.buffer_size
+    )
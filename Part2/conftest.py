@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The operator library shared by Image Lab and Live Cam FX is the ../common package
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
@@ -1,81 +1,85 @@
 import os
+import cv2
 import numpy as np
-from PIL import Image, ImageDraw
+
+# Size of the design canvas each overlay is drawn on; rendering at any other
+# size scales the shapes, not a bitmap, so edges stay sharp.
+BASE_SIZES = {
+    'sunglasses': (300, 100),
+    'hat': (300, 200),
+    'mustache': (200, 60)
+}
 
 def create_directory():
     overlay_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'overlays')
     os.makedirs(overlay_dir, exist_ok=True)
     return overlay_dir
 
-def create_sunglasses_overlay():
-    width, height = 300, 100
-    image = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(image)
-
-
-    draw.rectangle([(10, 40), (width-10, 60)], fill=(0, 0, 0, 255))
-
-
-    draw.ellipse([(20, 20), (120, 80)], fill=(0, 0, 0, 200))
-
-
-    draw.ellipse([(180, 20), (280, 80)], fill=(0, 0, 0, 200))
-
-
-    draw.rectangle([(120, 40), (180, 60)], fill=(0, 0, 0, 255))
-
+def design_grid(name, width, height):
+    """Pixel centres of a width x height image, in design canvas coordinates."""
+    base_width, base_height = BASE_SIZES[name]
+    x = (np.arange(width) + 0.5) * base_width / width - 0.5
+    y = (np.arange(height) + 0.5) * base_height / height - 0.5
+    return x[np.newaxis, :], y[:, np.newaxis]
+
+# Shapes take inclusive pixel bounds like PIL's ImageDraw, i.e. they cover
+# [x0 - 0.5, x1 + 0.5] of the design canvas.
+def rectangle(x, y, x0, y0, x1, y1):
+    return (x > x0 - 0.5) & (x < x1 + 0.5) & (y > y0 - 0.5) & (y < y1 + 0.5)
+
+def ellipse(x, y, x0, y0, x1, y1):
+    cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+    rx, ry = (x1 - x0) / 2 + 0.5, (y1 - y0) / 2 + 0.5
+    return ((x - cx) / rx) ** 2 + ((y - cy) / ry) ** 2 <= 1.0
+
+def render_sunglasses(width, height):
+    x, y = design_grid('sunglasses', width, height)
+    image = np.zeros((height, width, 4), dtype=np.uint8)
+
+    image[rectangle(x, y, 10, 40, 290, 60)] = (0, 0, 0, 255)
+    image[ellipse(x, y, 20, 20, 120, 80)] = (0, 0, 0, 200)
+    image[ellipse(x, y, 180, 20, 280, 80)] = (0, 0, 0, 200)
+    image[rectangle(x, y, 120, 40, 180, 60)] = (0, 0, 0, 255)
     return image
 
-def create_hat_overlay():
-    width, height = 300, 200
-    image = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(image)
-
-
-    draw.rectangle([(20, 150), (width-20, 170)], fill=(139, 69, 19, 255))
-
-
-    draw.rectangle([(60, 50), (width-60, 150)], fill=(165, 42, 42, 255))
-
-
-    draw.rectangle([(60, 120), (width-60, 140)], fill=(0, 0, 0, 200))
+def render_hat(width, height):
+    x, y = design_grid('hat', width, height)
+    image = np.zeros((height, width, 4), dtype=np.uint8)
 
+    # Colours are BGRA
+    image[rectangle(x, y, 20, 150, 280, 170)] = (19, 69, 139, 255)
+    image[rectangle(x, y, 60, 50, 240, 150)] = (42, 42, 165, 255)
+    image[rectangle(x, y, 60, 120, 240, 140)] = (0, 0, 0, 200)
     return image
 
-def create_mustache_overlay():
-    width, height = 200, 60
-    image = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-
-
+def render_mustache(width, height):
+    x, y = design_grid('mustache', width, height)
+    base_width, base_height = BASE_SIZES['mustache']
+    x_rel = (x - base_width / 2) / (base_width / 2)
+    y_rel = (y - base_height / 2) / (base_height / 2)
 
-    for i in range(width):
-        for j in range(height):
-
-            x_rel = (i - width/2) / (width/2)
-            y_rel = (j - height/2) / (height/2)
+    mask = ((np.abs(x_rel) < 0.8) & (np.abs(y_rel) < 0.5)
+            & (np.abs(y_rel - 0.2 * np.sin(np.pi * x_rel)) < 0.2))
 
+    image = np.zeros((height, width, 4), dtype=np.uint8)
+    image[mask] = (0, 0, 0, 200)
+    return image
 
-            if abs(x_rel) < 0.8 and abs(y_rel) < 0.5:
-                if abs(y_rel - 0.2 * np.sin(np.pi * x_rel)) < 0.2:
+RENDERERS = {
+    'sunglasses': render_sunglasses,
+    'hat': render_hat,
+    'mustache': render_mustache
+}
 
-                    image.putpixel((i, j), (0, 0, 0, 200))
-
-    return image
+def render_overlay(name, width, height):
+    """BGRA overlay drawn directly at width x height."""
+    return RENDERERS[name](width, height)
 
 def save_overlays():
     overlay_dir = create_directory()
 
-
-    sunglasses = create_sunglasses_overlay()
-    sunglasses.save(os.path.join(overlay_dir, 'sunglasses.png'))
-
-
-    hat = create_hat_overlay()
-    hat.save(os.path.join(overlay_dir, 'hat.png'))
-
-
-    mustache = create_mustache_overlay()
-    mustache.save(os.path.join(overlay_dir, 'mustache.png'))
+    for name, (width, height) in BASE_SIZES.items():
+        cv2.imwrite(os.path.join(overlay_dir, f'{name}.png'), render_overlay(name, width, height))
 
     print(f"Overlay images created in {overlay_dir}")
 
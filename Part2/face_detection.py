@@ -1,14 +1,98 @@
 import cv2
 import numpy as np
 import os
+import threading
+from collections import OrderedDict
+
+from common import imageops
+from create_overlays import RENDERERS, render_overlay
+from frame_arena import borrowed
+
+CASCADE_FILES = {
+    'face': 'haarcascade_frontalface_default.xml',
+    'eye': 'haarcascade_eye.xml'
+}
+
+# Cascades are parsed on first use (or by warm_up), not at import time.
+# detectMultiScale is not safe to call on one classifier from several threads,
+# so every thread gets its own; warm_up parks a spare set that the first
+# thread to need them takes over.
+_thread_cascades = threading.local()
+_spare_cascades = {}
+_cascade_lock = threading.Lock()
+
+def load_cascade(name):
+    return cv2.CascadeClassifier(cv2.data.haarcascades + CASCADE_FILES[name])
+
+def get_cascade(name):
+    cascades = getattr(_thread_cascades, 'cascades', None)
+    if cascades is None:
+        cascades = _thread_cascades.cascades = {}
+
+    cascade = cascades.get(name)
+    if cascade is None:
+        with _cascade_lock:
+            cascade = _spare_cascades.pop(name, None)
+        if cascade is None:
+            cascade = load_cascade(name)
+        cascades[name] = cascade
+    return cascade
+
+def warm_up():
+    """Load a set of cascades ahead of the first face frame."""
+    for name in CASCADE_FILES:
+        with _cascade_lock:
+            if name in _spare_cascades:
+                continue
+        cascade = load_cascade(name)
+        with _cascade_lock:
+            _spare_cascades.setdefault(name, cascade)
+
+# Coarser detection pyramids and a smaller bilateral window for the cheaper
+# quality tiers chosen by the adaptive quality controller.
+FACE_SCALE_FACTORS = (1.1, 1.2, 1.3)
+CARTOON_FACE_DIAMETERS = (9, 7, 5)
+
+def detect_faces(gray, quality_tier=0):
+    return get_cascade('face').detectMultiScale(
+        gray,
+        scaleFactor=FACE_SCALE_FACTORS[quality_tier],
+        minNeighbors=5,
+        minSize=(30, 30)
+    )
 
-face_cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-eye_cascade_path = cv2.data.haarcascades + 'haarcascade_eye.xml'
-
-face_cascade = cv2.CascadeClassifier(face_cascade_path)
-eye_cascade = cv2.CascadeClassifier(eye_cascade_path)
+class FaceDetector:
+    """Runs the face cascade every `interval` frames and reuses the last
+    detections in between."""
+
+    def __init__(self, interval=1, stats=None):
+        self.interval = interval
+        self.stats = stats
+        self.faces = ()
+        self.frame_shape = None
+        self.frames_since_detection = 0
+
+    def detect(self, gray, quality_tier=0):
+        if (gray.shape != self.frame_shape
+                or self.frames_since_detection >= self.interval - 1):
+            if self.stats is not None:
+                with self.stats.time("face_detection"):
+                    self.faces = detect_faces(gray, quality_tier)
+            else:
+                self.faces = detect_faces(gray, quality_tier)
+            self.frame_shape = gray.shape
+            self.frames_since_detection = 0
+        else:
+            self.frames_since_detection += 1
+        return self.faces
+
+# Decoded overlay images, shared by every engine/camera in the process.
+_overlay_cache = {}
 
 def load_overlay(overlay_name):
+    if overlay_name in _overlay_cache:
+        return _overlay_cache[overlay_name]
+
     overlay_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'overlays')
     os.makedirs(overlay_dir, exist_ok=True)
 
@@ -18,13 +102,56 @@ def load_overlay(overlay_name):
         return None
 
     overlay = cv2.imread(overlay_path, cv2.IMREAD_UNCHANGED)
+    _overlay_cache[overlay_name] = overlay
     return overlay
 
-def apply_overlay(frame, overlay, x, y, w, h):
+# Procedural overlays are rendered at the face size rounded up to this many
+# pixels and cached, so they are only ever scaled down by a few pixels.
+OVERLAY_BUCKET = 16
+_OVERLAY_CACHE_LIMIT = 64
+_rendered_overlays = OrderedDict()
+_rendered_lock = threading.Lock()
+
+def get_overlay(overlay_name, w, h):
+    """Overlay image of exactly w x h; built-in overlays are drawn at that size."""
+    if w <= 0 or h <= 0:
+        return None
+
+    if overlay_name not in RENDERERS:
+        overlay = load_overlay(overlay_name)
+        return None if overlay is None else cv2.resize(overlay, (w, h))
+
+    key = (overlay_name, -(-w // OVERLAY_BUCKET) * OVERLAY_BUCKET, -(-h // OVERLAY_BUCKET) * OVERLAY_BUCKET)
+    with _rendered_lock:
+        overlay = _rendered_overlays.get(key)
+        if overlay is not None:
+            _rendered_overlays.move_to_end(key)
+
     if overlay is None:
+        overlay = render_overlay(*key)
+        with _rendered_lock:
+            _rendered_overlays[key] = overlay
+            while len(_rendered_overlays) > _OVERLAY_CACHE_LIMIT:
+                _rendered_overlays.popitem(last=False)
+
+    if overlay.shape[:2] != (h, w):
+        overlay = cv2.resize(overlay, (w, h), interpolation=cv2.INTER_AREA)
+    return overlay
+
+def apply_overlay(frame, overlay, x, y, w, h):
+    if overlay is None or w <= 0 or h <= 0:
+        return frame
+
+    # Clip to the frame: hats in particular reach above the face box
+    frame_h, frame_w = frame.shape[:2]
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + w, frame_w), min(y + h, frame_h)
+    if x0 >= x1 or y0 >= y1:
         return frame
 
-    overlay_resized = cv2.resize(overlay, (w, h))
+    if overlay.shape[:2] != (h, w):
+        overlay = cv2.resize(overlay, (w, h))
+    overlay_resized = overlay[y0 - y:y1 - y, x0 - x:x1 - x]
 
     if overlay_resized.shape[2] == 4:
         alpha = overlay_resized[:, :, 3] / 255.0
@@ -32,32 +159,34 @@ def apply_overlay(frame, overlay, x, y, w, h):
 
         overlay_rgb = overlay_resized[:, :, 0:3]
 
-        roi = frame[y:y+h, x:x+w]
+        roi = frame[y0:y1, x0:x1]
 
         blended = (1.0 - alpha) * roi + alpha * overlay_rgb
 
-        frame[y:y+h, x:x+w] = blended
+        frame[y0:y1, x0:x1] = blended
 
     return frame
 
-def apply_face_filter(frame, filter_type, params=None):
+def apply_face_filter(frame, filter_type, params=None, detector=None, arena=None):
     if params is None:
         params = {}
 
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    with borrowed(arena, frame.shape[:2]) as gray:
+        return _apply_face_filter(frame, imageops.to_gray(frame, dst=gray), filter_type, params, detector)
 
-    faces = face_cascade.detectMultiScale(
-        gray,
-        scaleFactor=1.1,
-        minNeighbors=5,
-        minSize=(30, 30)
-    )
+def _apply_face_filter(frame, gray, filter_type, params, detector):
+    quality_tier = params.get('quality_tier', 0)
+
+    if detector is not None:
+        faces = detector.detect(gray, quality_tier)
+    else:
+        faces = detect_faces(gray, quality_tier)
 
     result = frame.copy()
     for (x, y, w, h) in faces:
         if filter_type == "sunglasses":
             roi_gray = gray[y:y+h, x:x+w]
-            eyes = eye_cascade.detectMultiScale(roi_gray)
+            eyes = get_cascade('eye').detectMultiScale(roi_gray)
 
             if len(eyes) >= 2:
                 eyes = sorted(eyes, key=lambda e: e[0])
@@ -67,7 +196,7 @@ def apply_face_filter(frame, filter_type, params=None):
                 eye_w = eyes[1][0] + eyes[1][2] - eyes[0][0]
                 eye_h = int(eye_w * 0.5)
 
-                sunglasses = load_overlay("sunglasses")
+                sunglasses = get_overlay("sunglasses", eye_w, eye_h)
                 if sunglasses is not None:
                     result = apply_overlay(result, sunglasses, eye_x, eye_y, eye_w, eye_h)
 
@@ -77,7 +206,7 @@ def apply_face_filter(frame, filter_type, params=None):
             hat_x = x - int((hat_w - w) / 2)
             hat_y = y - hat_h + int(0.1 * h)
 
-            hat = load_overlay("hat")
+            hat = get_overlay("hat", hat_w, hat_h)
             if hat is not None:
                 result = apply_overlay(result, hat, hat_x, hat_y, hat_w, hat_h)
 
@@ -87,7 +216,7 @@ def apply_face_filter(frame, filter_type, params=None):
             mustache_x = x + int(w * 0.2)
             mustache_y = y + int(h * 0.65)
 
-            mustache = load_overlay("mustache")
+            mustache = get_overlay("mustache", mustache_w, mustache_h)
             if mustache is not None:
                 result = apply_overlay(result, mustache, mustache_x, mustache_y, mustache_w, mustache_h)
 
@@ -109,15 +238,13 @@ def apply_face_filter(frame, filter_type, params=None):
 
             blur_level = params.get('blur_level', 25)
 
-            blurred_face = cv2.GaussianBlur(face_roi, (blur_level, blur_level), 0)
-
-            result[y:y+h, x:x+w] = blurred_face
+            imageops.gaussian_blur(face_roi, blur_level, dst=face_roi)
 
         elif filter_type == "cartoon_face":
             face_roi = result[y:y+h, x:x+w]
 
-            gray_face = cv2.cvtColor(face_roi, cv2.COLOR_BGR2GRAY)
-            gray_blurred = cv2.medianBlur(gray_face, 5)
+            gray_face = imageops.to_gray(face_roi)
+            gray_blurred = imageops.median_blur(gray_face, 5, dst=gray_face)
 
             edges = cv2.adaptiveThreshold(
                 gray_blurred, 255,
@@ -125,7 +252,7 @@ def apply_face_filter(frame, filter_type, params=None):
                 cv2.THRESH_BINARY, 9, 9
             )
 
-            color = cv2.bilateralFilter(face_roi, 9, 300, 300)
+            color = cv2.bilateralFilter(face_roi, CARTOON_FACE_DIAMETERS[quality_tier], 300, 300)
 
             cartoon_face = cv2.bitwise_and(color, color, mask=edges)
 
@@ -134,40 +261,24 @@ def apply_face_filter(frame, filter_type, params=None):
         elif filter_type == "negative":
             face_roi = result[y:y+h, x:x+w]
 
-            negative_face = 255 - face_roi
-
-            result[y:y+h, x:x+w] = negative_face
+            imageops.invert(face_roi, dst=face_roi)
 
         elif filter_type == "sepia_face":
             face_roi = result[y:y+h, x:x+w]
 
-            sepia_kernel = np.array([
-                [0.393, 0.769, 0.189],
-                [0.349, 0.686, 0.168],
-                [0.272, 0.534, 0.131]
-            ])
-
-            sepia_face = cv2.transform(face_roi, sepia_kernel)
-            sepia_face = np.clip(sepia_face, 0, 255).astype(np.uint8)
-
-            result[y:y+h, x:x+w] = sepia_face
+            imageops.sepia(face_roi, dst=face_roi)
 
         elif filter_type == "face_only":
-            gray_frame = cv2.cvtColor(result, cv2.COLOR_BGR2GRAY)
-            gray_frame = cv2.cvtColor(gray_frame, cv2.COLOR_GRAY2BGR)
-
-            mask = np.zeros_like(result)
-            mask[y:y+h, x:x+w] = 255
+            # Gray out everything, then paste the face back from the colour frame
+            gray_frame = imageops.gray_to_bgr(imageops.to_gray(result, dst=gray))
+            gray_frame[y:y+h, x:x+w] = result[y:y+h, x:x+w]
 
-            result = np.where(mask > 0, result, gray_frame)
+            result = gray_frame
 
         elif filter_type == "edge_face":
             face_roi = result[y:y+h, x:x+w]
 
-            gray_face = cv2.cvtColor(face_roi, cv2.COLOR_BGR2GRAY)
-            edges = cv2.Canny(gray_face, 100, 200)
-            edges_colored = cv2.cvtColor(edges, cv2.COLOR_GRAY2BGR)
-
-            result[y:y+h, x:x+w] = edges_colored
+            edges = imageops.canny(face_roi, 100, 200)
+            imageops.gray_to_bgr(edges, dst=face_roi)
 
     return result
@@ -0,0 +1,45 @@
+import itertools
+from collections.abc import Mapping
+
+# Versions are unique across every snapshot in the process, so caches shared
+# by several engines (e.g. multi-camera) never confuse two parameter sets.
+_versions = itertools.count(1)
+
+
+class ParamSnapshot(Mapping):
+    """Immutable, versioned set of filter parameters.
+
+    The UI builds a new snapshot for every change and swaps it in with a
+    single attribute assignment; the processing thread reads the attribute
+    once per frame and sees a consistent set. Anything precomputed from the
+    parameters can be keyed on `version` instead of being rebuilt per frame.
+    """
+
+    __slots__ = ('_values', 'version')
+
+    def __init__(self, values):
+        object.__setattr__(self, '_values', dict(values))
+        object.__setattr__(self, 'version', next(_versions))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ParamSnapshot is immutable")
+
+    def __getitem__(self, key):
+        return self._values[key]
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __repr__(self):
+        return f"ParamSnapshot(version={self.version}, {self._values!r})"
+
+    def replace(self, **changes):
+        """Return a snapshot with `changes` applied, or self if nothing changed."""
+        if all(key in self._values and self._values[key] == value for key, value in changes.items()):
+            return self
+        values = dict(self._values)
+        values.update(changes)
+        return ParamSnapshot(values)
@@ -37,7 +37,7 @@ class FilterTransition:
         if elapsed >= self.transition_time:
             self.is_transitioning = False
 
-    def apply(self, frame):
+    def apply(self, frame, arena=None):
         if not self.is_transitioning:
             return None
 
@@ -48,16 +48,19 @@ class FilterTransition:
         progress = min(elapsed / self.transition_time, 1.0)
 
 
+        # Built-in filters never modify their input, so only custom filters
+        # get a copy. Both results are fresh arrays owned by the transition,
+        # which lets blend_frames write into them.
         if self.from_custom_filter:
             from_result = self.from_custom_filter.apply(frame.copy())
         else:
-            from_result = apply_filter(frame.copy(), self.from_filter, self.from_params)
+            from_result = apply_filter(frame, self.from_filter, self.from_params, arena=arena)
 
 
         if self.to_custom_filter:
             to_result = self.to_custom_filter.apply(frame.copy())
         else:
-            to_result = apply_filter(frame.copy(), self.to_filter, self.to_params)
+            to_result = apply_filter(frame, self.to_filter, self.to_params, arena=arena)
 
 
         blended = self.blend_frames(from_result, to_result, progress)
@@ -65,11 +68,11 @@ class FilterTransition:
         return blended
 
     def blend_frames(self, frame1, frame2, alpha):
-        return cv2.addWeighted(frame1, 1 - alpha, frame2, alpha, 0)
+        return cv2.addWeighted(frame1, 1 - alpha, frame2, alpha, 0, dst=frame1)
 
 class FadeTransition(FilterTransition):
     def blend_frames(self, frame1, frame2, alpha):
-        return cv2.addWeighted(frame1, 1 - alpha, frame2, alpha, 0)
+        return cv2.addWeighted(frame1, 1 - alpha, frame2, alpha, 0, dst=frame1)
 
 class WipeTransition(FilterTransition):
     def blend_frames(self, frame1, frame2, alpha):
@@ -149,11 +152,10 @@ class DissolveTransition(FilterTransition):
         h, w = frame1.shape[:2]
 
 
-        if self.noise_mask is None:
+        # The processing size can change mid-transition (adaptive quality)
+        if self.noise_mask is None or self.noise_mask.shape != (h, w):
             self.noise_mask = np.random.random((h, w))
 
-        mask = self.noise_mask < alpha
-        mask = np.expand_dims(mask, axis=2).repeat(3, axis=2)
-        result = np.where(mask, frame2, frame1)
+        np.copyto(frame1, frame2, where=(self.noise_mask < alpha)[:, :, np.newaxis])
 
-        return result
+        return frame1
@@ -1,65 +1,122 @@
 import cv2
 import numpy as np
-
-def edge_detection(frame, threshold1, threshold2):
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    edges = cv2.Canny(gray, threshold1, threshold2)
-    return cv2.cvtColor(edges, cv2.COLOR_GRAY2BGR)
-
-def grayscale_quantization(frame, levels):
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    quantized = (gray // (256 // levels)) * (256 // levels)
-    return cv2.cvtColor(quantized, cv2.COLOR_GRAY2BGR)
-
-def contrast_enhancement(frame):
-    lab = cv2.cvtColor(frame, cv2.COLOR_BGR2LAB)
-    l, a, b = cv2.split(lab)
-    clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
-    cl = clahe.apply(l)
-    enhanced_lab = cv2.merge((cl, a, b))
-    return cv2.cvtColor(enhanced_lab, cv2.COLOR_LAB2BGR)
+import threading
+from collections import OrderedDict
+
+from common import imageops
+from face_detection import apply_face_filter
+from frame_arena import borrowed
+
+# Bilateral filter window per quality tier (0 = full quality).
+CARTOON_DIAMETERS = (9, 7, 5)
+
+FACE_FILTER_TYPES = {
+    10: "sunglasses",
+    11: "hat",
+    12: "mustache",
+    13: "pixelate",
+    14: "blur",
+    15: "cartoon_face",
+    16: "negative",
+    17: "sepia_face",
+    18: "face_only",
+    19: "edge_face"
+}
+
+# Precomputed per-parameter state (vignette masks, ...), keyed on the
+# ParamSnapshot version so it is rebuilt only when the parameters change.
+_PRECOMPUTED_LIMIT = 16
+_precomputed = OrderedDict()
+_precomputed_lock = threading.Lock()
+_thread_local = threading.local()
+
+def cached_for_params(name, params, shape, build):
+    version = getattr(params, 'version', None)
+    if version is None:
+        return build()
+
+    key = (name, shape, version)
+    with _precomputed_lock:
+        value = _precomputed.get(key)
+        if value is not None:
+            _precomputed.move_to_end(key)
+            return value
+
+    value = build()
+    with _precomputed_lock:
+        _precomputed[key] = value
+        while len(_precomputed) > _PRECOMPUTED_LIMIT:
+            _precomputed.popitem(last=False)
+    return value
+
+def get_clahe():
+    # CLAHE objects keep internal buffers, so each thread gets its own
+    clahe = getattr(_thread_local, 'clahe', None)
+    if clahe is None:
+        clahe = _thread_local.clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
+    return clahe
+
+# Filters take an optional FrameArena for their per-frame temporaries; only
+# the returned frame is a fresh array.
+def edge_detection(frame, threshold1, threshold2, arena=None):
+    with borrowed(arena, frame.shape[:2]) as gray, borrowed(arena, frame.shape[:2]) as edges:
+        imageops.to_gray(frame, dst=gray)
+        imageops.canny(gray, threshold1, threshold2, dst=edges)
+        return imageops.gray_to_bgr(edges)
+
+def grayscale_quantization(frame, levels, arena=None):
+    step = 256 // levels
+    with borrowed(arena, frame.shape[:2]) as gray:
+        imageops.to_gray(frame, dst=gray)
+        np.floor_divide(gray, step, out=gray)
+        np.multiply(gray, step, out=gray)
+        return imageops.gray_to_bgr(gray)
+
+def contrast_enhancement(frame, arena=None):
+    # Only the L channel changes, so it is equalised in place inside the LAB
+    # buffer instead of splitting and merging all three channels
+    with borrowed(arena, frame.shape) as lab, borrowed(arena, frame.shape[:2]) as l:
+        cv2.cvtColor(frame, cv2.COLOR_BGR2LAB, dst=lab)
+        cv2.extractChannel(lab, 0, dst=l)
+        get_clahe().apply(l, dst=l)
+        cv2.insertChannel(l, lab, 0)
+        return cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
 
 def soft_polished(frame, kernel_size):
-    return cv2.GaussianBlur(frame, (kernel_size, kernel_size), 0)
-
-def cartoon_filter(frame, edges_threshold, color_sigma):
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-
-    gray_blurred = cv2.medianBlur(gray, 7)
-
-    edges = cv2.adaptiveThreshold(
-        gray_blurred,
-        255,
-        cv2.ADAPTIVE_THRESH_MEAN_C,
-        cv2.THRESH_BINARY,
-        edges_threshold,
-        edges_threshold
-    )
-
-    color = cv2.bilateralFilter(
-        frame,
-        d=9,
-        sigmaColor=color_sigma,
-        sigmaSpace=color_sigma
-    )
-
-    cartoon = cv2.bitwise_and(color, color, mask=edges)
-    return cartoon
+    return imageops.gaussian_blur(frame, kernel_size)
+
+def cartoon_filter(frame, edges_threshold, color_sigma, diameter=9, arena=None):
+    with borrowed(arena, frame.shape[:2]) as gray, borrowed(arena, frame.shape[:2]) as edges, \
+            borrowed(arena, frame.shape) as color:
+        imageops.to_gray(frame, dst=gray)
+
+        gray_blurred = imageops.median_blur(gray, 7, dst=gray)
+
+        cv2.adaptiveThreshold(
+            gray_blurred,
+            255,
+            cv2.ADAPTIVE_THRESH_MEAN_C,
+            cv2.THRESH_BINARY,
+            edges_threshold,
+            edges_threshold,
+            dst=edges
+        )
+
+        cv2.bilateralFilter(
+            frame,
+            d=diameter,
+            sigmaColor=color_sigma,
+            sigmaSpace=color_sigma,
+            dst=color
+        )
+
+        cartoon = cv2.bitwise_and(color, color, mask=edges)
+        return cartoon
 
 def sepia_filter(frame):
-    sepia_kernel = np.array([
-        [0.393, 0.769, 0.189],
-        [0.349, 0.686, 0.168],
-        [0.272, 0.534, 0.131]
-    ])
-
-    sepia = cv2.transform(frame, sepia_kernel)
-    sepia = np.clip(sepia, 0, 255).astype(np.uint8)
-    return sepia
-
-def vignette_filter(frame, sigma=200):
-    height, width = frame.shape[:2]
+    return imageops.sepia(frame)
 
+def vignette_mask(height, width, sigma=200):
     X_resultant, Y_resultant = np.meshgrid(np.arange(width), np.arange(height))
     centerX, centerY = width // 2, height // 2
 
@@ -68,44 +125,40 @@ def vignette_filter(frame, sigma=200):
     dist = dist / np.max(dist)
 
     mask = np.exp(-dist ** 2 / (2 * (sigma / 1000) ** 2))
-    mask = np.dstack([mask] * 3)
-    vignette = frame * mask
-    return vignette.astype(np.uint8)
+    return np.dstack([mask] * 3)
+
+def vignette_filter(frame, sigma=200, mask=None, arena=None):
+    if mask is None:
+        mask = vignette_mask(frame.shape[0], frame.shape[1], sigma)
+    with borrowed(arena, frame.shape, mask.dtype) as vignette:
+        np.multiply(frame, mask, out=vignette)
+        return vignette.astype(np.uint8)
+
+def apply_filter(frame, filter_index, params, face_detector=None, arena=None):
+    quality_tier = params.get('quality_tier', 0)
 
-def apply_filter(frame, filter_index, params):
     if filter_index == 1:
-        return edge_detection(frame, params['edge_threshold1'], params['edge_threshold2'])
+        return edge_detection(frame, params['edge_threshold1'], params['edge_threshold2'], arena)
     elif filter_index == 2:
-        return grayscale_quantization(frame, params['grayscale_levels'])
+        return grayscale_quantization(frame, params['grayscale_levels'], arena)
     elif filter_index == 3:
-        return contrast_enhancement(frame)
+        return contrast_enhancement(frame, arena)
     elif filter_index == 4:
         return soft_polished(frame, params['blur_kernel_size'])
     elif filter_index == 5:
-        return cartoon_filter(frame, params['cartoon_edges_threshold'], params['cartoon_color_sigma'])
+        return cartoon_filter(frame, params['cartoon_edges_threshold'], params['cartoon_color_sigma'],
+                              CARTOON_DIAMETERS[quality_tier], arena)
     elif filter_index == 6:
         return sepia_filter(frame)
     elif filter_index == 7:
         sigma = params.get('vignette_sigma', 200)
-        return vignette_filter(frame, sigma)
+        height, width = frame.shape[:2]
+        mask = cached_for_params('vignette_mask', params, (height, width),
+                                 lambda: vignette_mask(height, width, sigma))
+        return vignette_filter(frame, sigma, mask, arena)
     elif filter_index >= 10 and filter_index < 20:
-        from face_detection import apply_face_filter
-
-        face_filter_types = {
-            10: "sunglasses",
-            11: "hat",
-            12: "mustache",
-            13: "pixelate",
-            14: "blur",
-            15: "cartoon_face",
-            16: "negative",
-            17: "sepia_face",
-            18: "face_only",
-            19: "edge_face"
-        }
-
-        face_filter_type = face_filter_types.get(filter_index, "blur")
-        return apply_face_filter(frame, face_filter_type, params)
+        face_filter_type = FACE_FILTER_TYPES.get(filter_index, "blur")
+        return apply_face_filter(frame, face_filter_type, params, face_detector, arena)
 
 
 
@@ -0,0 +1,93 @@
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+
+class FrameArena:
+    """Reusable frame-sized scratch buffers, keyed by (shape, dtype).
+
+    Pipeline stages borrow a buffer for the temporaries of one frame (gray,
+    LAB, masks, ...) and hand it back when done, so the next frame reuses the
+    same memory instead of allocating and faulting in fresh pages. Borrowed
+    buffers are uninitialised and must never escape the stage: anything that
+    is returned to the caller, queued for the recorder or published to the
+    stream server has to be a regular array.
+    """
+
+    def __init__(self, max_free_per_key=4):
+        self.max_free_per_key = max_free_per_key
+        self.lock = threading.Lock()
+        self.free = {}
+        self.outstanding = {}
+
+        self.allocations = 0
+        self.reuses = 0
+        self.outstanding_bytes = 0
+        self.peak_outstanding = 0
+        self.peak_outstanding_bytes = 0
+
+    def acquire(self, shape, dtype=np.uint8):
+        key = (tuple(shape), np.dtype(dtype))
+        with self.lock:
+            free = self.free.get(key)
+            if free:
+                buffer = free.pop()
+                self.reuses += 1
+            else:
+                buffer = None
+                self.allocations += 1
+
+        if buffer is None:
+            buffer = np.empty(key[0], dtype=key[1])
+
+        with self.lock:
+            self.outstanding[id(buffer)] = buffer
+            self.outstanding_bytes += buffer.nbytes
+            self.peak_outstanding = max(self.peak_outstanding, len(self.outstanding))
+            self.peak_outstanding_bytes = max(self.peak_outstanding_bytes, self.outstanding_bytes)
+        return buffer
+
+    def release(self, buffer):
+        with self.lock:
+            if self.outstanding.pop(id(buffer), None) is None:
+                raise ValueError("buffer was not borrowed from this arena")
+            self.outstanding_bytes -= buffer.nbytes
+
+            free = self.free.setdefault((buffer.shape, buffer.dtype), [])
+            if len(free) < self.max_free_per_key:
+                free.append(buffer)
+
+    @contextmanager
+    def borrow(self, shape, dtype=np.uint8):
+        buffer = self.acquire(shape, dtype)
+        try:
+            yield buffer
+        finally:
+            self.release(buffer)
+
+    def clear(self):
+        """Drop the idle buffers, e.g. after the processing size changed."""
+        with self.lock:
+            self.free.clear()
+
+    def summary(self):
+        with self.lock:
+            return {
+                'arena_allocations': self.allocations,
+                'arena_reuses': self.reuses,
+                'arena_outstanding': len(self.outstanding),
+                'arena_peak_outstanding': self.peak_outstanding,
+                'arena_peak_outstanding_mb': self.peak_outstanding_bytes / 2 ** 20,
+                'arena_idle_mb': sum(b.nbytes for free in self.free.values() for b in free) / 2 ** 20
+            }
+
+
+@contextmanager
+def borrowed(arena, shape, dtype=np.uint8):
+    """Borrow from arena, or allocate a plain array when there is none."""
+    if arena is None:
+        yield np.empty(shape, dtype=dtype)
+    else:
+        with arena.borrow(shape, dtype) as buffer:
+            yield buffer
@@ -0,0 +1,107 @@
+import argparse
+import os
+import sys
+import time
+import cv2
+
+# The operator library shared by Image Lab and Live Cam FX is the ../common package
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from video_engine import VideoEngine, TRANSITION_TYPES
+from capture import add_capture_arguments, settings_from_args, open_capture
+from stream_server import MJPEGStreamServer
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run Video Filter Studio effects without a display")
+    parser.add_argument("--input", default=None, help="Video file path (default: capture from --camera)")
+    parser.add_argument("--output", help="Optional path for the filtered video")
+    parser.add_argument("--filter", type=int, default=0, help="Filter index (0-19)")
+    parser.add_argument("--transition", default="fade", choices=sorted(TRANSITION_TYPES))
+    parser.add_argument("--max-frames", type=int, default=None)
+    parser.add_argument("--stats-output", help="Write per-stage latency stats to <path>.json and <path>.csv")
+    parser.add_argument("--stats-overlay", action="store_true", help="Draw latency stats onto the output")
+    parser.add_argument("--stream-port", type=int, default=None, help="Serve the filtered feed as MJPEG on this port")
+    parser.add_argument("--stream-host", default="127.0.0.1",
+                        help="Address the MJPEG server binds to (0.0.0.0 exposes it on the network)")
+    add_capture_arguments(parser)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    if args.input is not None:
+        cap = cv2.VideoCapture(args.input)
+    else:
+        cap = open_capture(settings_from_args(args))
+    if not cap.isOpened():
+        raise SystemExit(f"Cannot open video source: {args.input or args.camera}")
+
+    engine = VideoEngine(processing_width=args.processing_width)
+    if args.input is None:
+        # Only a live camera has a frame clock to measure dropped frames against
+        engine.latency.nominal_fps = cap.get(cv2.CAP_PROP_FPS) or None
+    if args.target_frame_ms is not None:
+        engine.enable_adaptive_quality(args.target_frame_ms)
+    if args.static_threshold is not None:
+        engine.enable_static_scene_reuse(args.static_threshold)
+    engine.show_stats_overlay = args.stats_overlay
+    engine.set_transition_type(args.transition)
+    engine.set_filter(args.filter, animate=False)
+
+    writer = None
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30
+
+    stream_server = None
+    if args.stream_port is not None:
+        stream_server = MJPEGStreamServer(host=args.stream_host, port=args.stream_port).start()
+        print(f"Streaming on http://{args.stream_host}:{stream_server.port}/stream.mjpg")
+
+    writer_size = None
+
+    def on_frame(original_display, output):
+        nonlocal writer, writer_size
+        if stream_server is not None:
+            stream_server.publish(output)
+        if args.output is None:
+            engine.latency.stamp_displayed(engine.last_frame_id)
+            return
+        if writer is None:
+            # The output size is only known once the first frame is processed
+            height, width = output.shape[:2]
+            writer_size = (width, height)
+            fourcc = cv2.VideoWriter_fourcc(*"mp4v")
+            writer = cv2.VideoWriter(args.output, fourcc, fps, writer_size)
+        elif (output.shape[1], output.shape[0]) != writer_size:
+            # Adaptive quality can change the processing size mid-run
+            output = cv2.resize(output, writer_size, interpolation=cv2.INTER_LINEAR)
+        writer.write(output)
+        engine.latency.stamp_displayed(engine.last_frame_id)
+
+    start_time = time.perf_counter()
+    try:
+        engine.run(cap, on_frame, max_frames=args.max_frames)
+    finally:
+        cap.release()
+        if writer is not None:
+            writer.release()
+        if stream_server is not None:
+            stream_server.stop()
+
+    elapsed = time.perf_counter() - start_time
+    stats = engine.get_stats()
+    average_fps = stats['frames_processed'] / elapsed if elapsed > 0 else 0
+    print(f"Processed {stats['frames_processed']} frames, average FPS {average_fps:.1f}, "
+          f"dropped {stats['frames_dropped']}, superseded {stats['frames_superseded']}")
+    for stage, stage_stats in sorted(stats['stages'].items()):
+        print(f"  {stage:<28} p50 {stage_stats['p50']:7.2f} ms  p95 {stage_stats['p95']:7.2f} ms  "
+              f"p99 {stage_stats['p99']:7.2f} ms")
+
+    if args.stats_output:
+        engine.stats.dump_json(f"{args.stats_output}.json")
+        engine.stats.dump_csv(f"{args.stats_output}.csv")
+
+
+if __name__ == "__main__":
+    main()
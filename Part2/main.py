@@ -1,12 +1,53 @@
+import time
+STARTED = time.perf_counter()
+
+import argparse
+import os
+import sys
+# The operator library shared by Image Lab and Live Cam FX is the ../common package
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
 import customtkinter as ctk
 from video_filter_app import VideoFilterApp
+from capture import add_capture_arguments, settings_from_args
+
+IMPORTED = time.perf_counter()
+
+def print_startup_times(window_built, first_frame):
+    print(f"imports       {(IMPORTED - STARTED) * 1000:8.1f} ms")
+    print(f"window built  {(window_built - STARTED) * 1000:8.1f} ms")
+    print(f"first frame   {(first_frame - STARTED) * 1000:8.1f} ms")
 
 def main():
+    parser = argparse.ArgumentParser(description="Video Filter Studio")
+    add_capture_arguments(parser)
+    parser.add_argument("--stream-port", type=int, default=None, help="Serve the filtered feed as MJPEG on this port")
+    parser.add_argument("--stream-host", default="127.0.0.1",
+                        help="Address the MJPEG server binds to (0.0.0.0 exposes it on the network)")
+    parser.add_argument("--startup-time", action="store_true",
+                        help="Print the time to the first displayed frame and exit")
+    args = parser.parse_args()
+
     ctk.set_appearance_mode("System")
     ctk.set_default_color_theme("blue")
 
+    def report_startup():
+        print_startup_times(window_built, time.perf_counter())
+        root.after(0, app.on_closing)
+
     root = ctk.CTk()
-    VideoFilterApp(root, "Video Filter Studio")
+    app = VideoFilterApp(
+        root,
+        "Video Filter Studio",
+        capture_settings=settings_from_args(args),
+        processing_width=args.processing_width,
+        target_frame_ms=args.target_frame_ms,
+        static_scene_threshold=args.static_threshold,
+        stream_port=args.stream_port,
+        stream_host=args.stream_host,
+        on_first_frame=report_startup if args.startup_time else None
+    )
+    window_built = time.perf_counter()
     root.mainloop()
 
 if __name__ == "__main__":
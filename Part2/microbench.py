@@ -0,0 +1,182 @@
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+# The operator library shared by Image Lab and Live Cam FX is the ../common package
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+import filters
+from benchmark import compare_to_baseline
+from face_detection import apply_face_filter
+from synthetic import synthetic_frame
+
+RESOLUTIONS = {
+    '360p': (640, 360),
+    '720p': (1280, 720),
+    '1080p': (1920, 1080),
+    '4k': (3840, 2160)
+}
+
+FACE_COUNTS = (0, 1, 4)
+
+FACE_MODES = (
+    "sunglasses", "hat", "mustache", "pixelate", "blur",
+    "cartoon_face", "negative", "sepia_face", "face_only", "edge_face"
+)
+
+DEFAULT_PARAMS = {'pixel_size': 15, 'blur_level': 25}
+
+# Regression checks against a --baseline file, see benchmark.compare_to_baseline
+CASE_METRICS = (
+    ('ops_per_sec', "speed", ".1f", " ops/s", True),
+    ('alloc_peak_bytes', "allocation peak", "d", " B/call", False)
+)
+
+# Snapshot bookkeeping and the measuring code's own locals are not part of the call
+SNAPSHOT_FILTERS = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__))
+
+# Whole-frame functions from filters.py; the face count does not affect them,
+# so they are only run on single-face frames.
+FRAME_FUNCTIONS = {
+    'edge_detection': lambda frame: filters.edge_detection(frame, 100, 200),
+    'grayscale_quantization': lambda frame: filters.grayscale_quantization(frame, 8),
+    'contrast_enhancement': filters.contrast_enhancement,
+    'soft_polished': lambda frame: filters.soft_polished(frame, 9),
+    'cartoon_filter': lambda frame: filters.cartoon_filter(frame, 9, 250),
+    'sepia_filter': filters.sepia_filter,
+    'vignette_mask': lambda frame: filters.vignette_mask(frame.shape[0], frame.shape[1], 200),
+    'vignette_filter': lambda frame: filters.vignette_filter(frame, 200)
+}
+
+
+def build_cases(resolutions, face_counts):
+    """Yield (name, resolution, faces, function) for every benchmark case."""
+    for resolution in resolutions:
+        for name, function in FRAME_FUNCTIONS.items():
+            yield f"filters.{name}@{resolution}", resolution, 1, function
+        for faces in face_counts:
+            for mode in FACE_MODES:
+                function = (lambda frame, mode=mode: apply_face_filter(frame, mode, DEFAULT_PARAMS))
+                yield f"face.{mode}@{resolution}/{faces}f", resolution, faces, function
+
+
+def time_case(function, frame, min_time, min_calls):
+    function(frame)
+
+    calls = 0
+    start_time = time.perf_counter()
+    elapsed = 0.0
+    while calls < min_calls or elapsed < min_time:
+        function(frame)
+        calls += 1
+        elapsed = time.perf_counter() - start_time
+    return calls / elapsed, elapsed / calls * 1000.0
+
+
+def measure_allocations(function, frame):
+    """Allocation profile of one call, as seen by tracemalloc.
+
+    'alloc_peak_bytes' is the high-water mark of memory allocated during the
+    call (numpy buffers included), 'alloc_blocks' the number of new memory
+    blocks still alive after the call: the returned result (an array is two
+    blocks, object and data) plus anything the call cached or leaked.
+    """
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        start_current, _ = tracemalloc.get_traced_memory()
+        result = function(frame)
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    after = after.filter_traces(SNAPSHOT_FILTERS)
+    before = before.filter_traces(SNAPSHOT_FILTERS)
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+    del result
+    return peak - start_current, blocks
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for filters.py and face_detection.py")
+    parser.add_argument("--resolution", action="append", dest="resolutions", choices=sorted(RESOLUTIONS),
+                        help="Resolution to run; repeatable (default: all)")
+    parser.add_argument("--faces", type=int, action="append", dest="face_counts",
+                        help="Face count for the face modes; repeatable (default: 0, 1 and 4)")
+    parser.add_argument("--only", help="Only run cases whose name matches this glob, e.g. 'face.blur@*'")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Minimum seconds per case")
+    parser.add_argument("--min-calls", type=int, default=3, help="Minimum calls per case")
+    parser.add_argument("--output", help="Write results as JSON")
+    parser.add_argument("--baseline", help="Compare against a previous --output file")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative regression (default 0.15)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 on regressions")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    resolutions = args.resolutions or list(RESOLUTIONS)
+    face_counts = args.face_counts if args.face_counts is not None else FACE_COUNTS
+
+    frames = {}
+    results = {}
+    for name, resolution, faces, function in build_cases(resolutions, face_counts):
+        if args.only and not fnmatch.fnmatch(name, args.only):
+            continue
+
+        key = (resolution, faces)
+        if key not in frames:
+            width, height = RESOLUTIONS[resolution]
+            frames[key] = synthetic_frame(width, height, faces)
+        frame = frames[key]
+
+        ops_per_sec, ms_per_call = time_case(function, frame, args.min_time, args.min_calls)
+        alloc_peak_bytes, alloc_blocks = measure_allocations(function, frame)
+
+        results[name] = {
+            'ops_per_sec': ops_per_sec,
+            'ms_per_call': ms_per_call,
+            'alloc_peak_bytes': alloc_peak_bytes,
+            'alloc_blocks': alloc_blocks
+        }
+        print(f"{name:<38} {ops_per_sec:9.1f} ops/s {ms_per_call:9.2f} ms  "
+              f"{alloc_peak_bytes / 1e6:8.2f} MB/call  {alloc_blocks:4d} blocks")
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'opencv': cv2.__version__,
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'threads': cv2.getNumThreads(),
+            'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S")
+        },
+        'results': results
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.tolerance, CASE_METRICS)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+# The operator library shared by Image Lab and Live Cam FX is the ../common package
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from video_engine import VideoEngine
+from capture import CaptureSettings, open_capture
+from recorder import VideoRecorder
+
+
+class CameraSource:
+    """One capture device with its own engine (filter, parameters, stats).
+
+    A reader thread keeps only the newest frame; frames replaced before a
+    worker picks them up are counted as superseded by the engine's latency
+    tracker. With drop_frames=False (video files) the reader waits for the
+    previous frame to be taken instead.
+    """
+
+    def __init__(self, name, capture, engine=None, on_frame=None, drop_frames=True):
+        self.name = name
+        self.capture = capture
+        self.drop_frames = drop_frames
+        self.engine = engine if engine is not None else VideoEngine()
+        self.on_frame = on_frame
+
+        self.latest = None
+        self.busy = False
+        self.finished = False
+        self.reader = None
+
+    def start_reader(self, condition):
+        self.reader = threading.Thread(target=self._read_frames, args=(condition,), name=f"capture-{self.name}")
+        self.reader.daemon = True
+        self.reader.start()
+
+    def _read_frames(self, condition):
+        try:
+            while not self.finished:
+                with self.engine.stats.time("capture"):
+                    ret, frame = self.capture.read()
+                if not ret:
+                    with condition:
+                        self.finished = True
+                        condition.notify_all()
+                    break
+
+                with condition:
+                    while not self.drop_frames and self.latest is not None and not self.finished:
+                        condition.wait(timeout=0.1)
+                    frame_id = self.engine.latency.stamp_capture()
+                    if self.latest is not None:
+                        self.engine.latency.mark_superseded(self.latest[0])
+                    self.latest = (frame_id, frame)
+                    condition.notify_all()
+        finally:
+            # Released here rather than in release(), which may give up
+            # waiting while read() is still blocked on the device
+            self.capture.release()
+
+    def release(self):
+        self.finished = True
+        if self.reader is not None:
+            self.reader.join(timeout=1.0)
+        else:
+            self.capture.release()
+
+
+class MultiCameraProcessor:
+    """Processes N camera sources on a shared worker pool.
+
+    Each source has at most one frame in flight, so a slow filter on one
+    camera cannot starve the others. The pool defaults to one worker per
+    core (capped at the number of sources); OpenCV releases the GIL inside
+    its kernels, so threads scale across cores. Overlay images are shared by
+    all sources; each worker thread has its own face cascades. The first
+    exception raised while processing a frame stops the processor and is
+    re-raised by wait().
+    """
+
+    def __init__(self, sources, max_workers=None):
+        self.sources = list(sources)
+        if max_workers is None:
+            max_workers = min(len(self.sources), os.cpu_count() or 1)
+        self.max_workers = max(1, max_workers)
+
+        self.condition = threading.Condition()
+        self.pool = None
+        self.dispatcher = None
+        self.is_running = False
+        self.error = None
+
+    def start(self):
+        self.is_running = True
+        self.pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="camera-worker")
+        for source in self.sources:
+            source.start_reader(self.condition)
+
+        self.dispatcher = threading.Thread(target=self._dispatch, name="camera-dispatcher")
+        self.dispatcher.daemon = True
+        self.dispatcher.start()
+        return self
+
+    def _dispatch(self):
+        while self.is_running:
+            with self.condition:
+                ready = [source for source in self.sources if source.latest is not None and not source.busy]
+                if not ready:
+                    if all(source.finished and source.latest is None for source in self.sources):
+                        self.is_running = False
+                        self.condition.notify_all()
+                        break
+                    self.condition.wait(timeout=0.1)
+                    continue
+
+                jobs = []
+                for source in ready:
+                    source.busy = True
+                    jobs.append((source, source.latest))
+                    source.latest = None
+
+            for source, (frame_id, frame) in jobs:
+                self.pool.submit(self._process, source, frame_id, frame)
+
+    def _process(self, source, frame_id, frame):
+        try:
+            original_display, output = source.engine.process_frame(frame, frame_id)
+            if source.on_frame is not None:
+                source.on_frame(source, original_display, output)
+        except Exception as e:
+            with self.condition:
+                if self.error is None:
+                    self.error = e
+                self.is_running = False
+        finally:
+            with self.condition:
+                source.busy = False
+                self.condition.notify_all()
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.condition:
+            while self.is_running:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self.condition.wait(timeout=remaining)
+            if self.error is not None:
+                raise self.error
+
+    def stop(self):
+        self.is_running = False
+        with self.condition:
+            self.condition.notify_all()
+        if self.dispatcher is not None:
+            self.dispatcher.join()
+        for source in self.sources:
+            source.release()
+        if self.pool is not None:
+            self.pool.shutdown(wait=True)
+
+    def get_stats(self):
+        stats = {}
+        for source in self.sources:
+            engine_stats = source.engine.get_stats()
+            latency = engine_stats['stages'].get("latency.capture_to_display", {})
+            stats[source.name] = {
+                'fps': engine_stats['fps'],
+                'frames_processed': engine_stats['frames_processed'],
+                'frames_superseded': engine_stats['frames_superseded'],
+                'latency_p50': latency.get('p50', 0.0),
+                'latency_p95': latency.get('p95', 0.0)
+            }
+        return stats
+
+
+def parse_source(spec):
+    """Parse DEVICE[:FILTER], where DEVICE is a camera index or a video file."""
+    device, _, filter_index = spec.rpartition(":")
+    if not device or not filter_index.isdigit():
+        device, filter_index = spec, "0"
+    return device, int(filter_index)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Process several cameras with per-camera filters")
+    parser.add_argument("--source", action="append", required=True, metavar="DEVICE[:FILTER]",
+                        help="Camera index or video file, optionally with a filter index; repeatable")
+    parser.add_argument("--workers", type=int, default=None, help="Worker threads (default: one per core)")
+    parser.add_argument("--processing-width", type=int, default=480)
+    parser.add_argument("--record-dir", help="Record each filtered stream into this folder")
+    parser.add_argument("--duration", type=float, default=None, help="Stop after this many seconds")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    recorders = {}
+
+    def on_frame(source, original_display, output):
+        recorder = recorders.get(source.name)
+        if recorder is not None:
+            recorder.submit(output)
+        source.engine.latency.stamp_displayed(source.engine.last_frame_id)
+
+    sources = []
+    for index, spec in enumerate(args.source):
+        device, filter_index = parse_source(spec)
+        is_camera = device.isdigit()
+        if is_camera:
+            capture = open_capture(CaptureSettings(device=int(device)))
+        else:
+            capture = cv2.VideoCapture(device)
+        if not capture.isOpened():
+            raise SystemExit(f"Cannot open video source: {device}")
+
+        engine = VideoEngine(processing_width=args.processing_width)
+        engine.set_filter(filter_index, animate=False)
+        name = f"cam{index}"
+        sources.append(CameraSource(name, capture, engine, on_frame, drop_frames=is_camera))
+
+        if args.record_dir:
+            os.makedirs(args.record_dir, exist_ok=True)
+            fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+            path = os.path.join(args.record_dir, f"{name}.mp4")
+            recorders[name] = VideoRecorder(path, fps=fps, stats=engine.stats).start()
+
+    processor = MultiCameraProcessor(sources, max_workers=args.workers).start()
+    try:
+        processor.wait(timeout=args.duration)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        processor.stop()
+        for recorder in recorders.values():
+            recorder.stop()
+
+    for name, stats in processor.get_stats().items():
+        print(f"{name}: {stats['frames_processed']} frames, FPS {stats['fps']:.1f}, "
+              f"latency p50 {stats['latency_p50']:.1f} ms p95 {stats['latency_p95']:.1f} ms, "
+              f"superseded {stats['frames_superseded']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+import csv
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import cv2
+import numpy as np
+
+PERCENTILES = (50, 95, 99)
+
+
+class RollingHistogram:
+    """Keeps the last `window` samples (milliseconds) of one stage."""
+
+    def __init__(self, window=300):
+        self.samples = deque(maxlen=window)
+        self.total_count = 0
+
+    def add(self, value_ms):
+        self.samples.append(value_ms)
+        self.total_count += 1
+
+    def summary(self):
+        if not self.samples:
+            return {'count': self.total_count, 'mean': 0.0, 'p50': 0.0, 'p95': 0.0, 'p99': 0.0}
+
+        values = np.fromiter(self.samples, dtype=np.float64, count=len(self.samples))
+        p50, p95, p99 = np.percentile(values, PERCENTILES)
+        return {
+            'count': self.total_count,
+            'mean': float(values.mean()),
+            'p50': float(p50),
+            'p95': float(p95),
+            'p99': float(p99)
+        }
+
+
+class PipelineStats:
+    """Per-stage latency probes for the live pipeline.
+
+    Stages are plain strings ("capture", "resize", "filter[5]", ...). Samples
+    can be recorded from both the processing thread and the Tk thread.
+    """
+
+    def __init__(self, window=300):
+        self.window = window
+        self.stages = {}
+        self.lock = threading.Lock()
+
+    def record(self, stage, value_ms):
+        with self.lock:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = RollingHistogram(self.window)
+            histogram.add(value_ms)
+
+    @contextmanager
+    def time(self, stage):
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, (time.perf_counter() - start_time) * 1000.0)
+
+    def summary(self):
+        with self.lock:
+            return {stage: histogram.summary() for stage, histogram in self.stages.items()}
+
+    def reset(self):
+        with self.lock:
+            self.stages.clear()
+
+    def draw_overlay(self, frame, origin=(8, 16)):
+        x, y = origin
+        for stage, stats in sorted(self.summary().items()):
+            text = f"{stage}: p50 {stats['p50']:.1f} p95 {stats['p95']:.1f} p99 {stats['p99']:.1f} ms"
+            cv2.putText(frame, text, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 0, 0), 3, cv2.LINE_AA)
+            cv2.putText(frame, text, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (255, 255, 255), 1, cv2.LINE_AA)
+            y += 14
+        return frame
+
+    def dump_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2, sort_keys=True)
+        return path
+
+    def dump_csv(self, path):
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["stage", "count", "mean_ms", "p50_ms", "p95_ms", "p99_ms"])
+            for stage, stats in sorted(self.summary().items()):
+                writer.writerow([
+                    stage, stats['count'],
+                    f"{stats['mean']:.3f}", f"{stats['p50']:.3f}",
+                    f"{stats['p95']:.3f}", f"{stats['p99']:.3f}"
+                ])
+        return path
+
+
+class FrameLatencyTracker:
+    """Follows individual frames from capture to display.
+
+    Every frame gets an id and a capture timestamp; the filter-completion
+    and display timestamps are added as it moves through the pipeline and
+    the resulting intervals are fed into `stats` as "latency.*" stages.
+    Frames replaced by a newer one before reaching the screen are counted
+    as superseded. When the camera's nominal FPS is known, gaps between
+    captures longer than one frame period are counted as dropped frames.
+    """
+
+    def __init__(self, stats, nominal_fps=None, max_pending=64):
+        self.stats = stats
+        self.nominal_fps = nominal_fps
+        self.max_pending = max_pending
+        self.lock = threading.Lock()
+
+        self.pending = {}
+        self.next_frame_id = 0
+        self.last_capture_time = None
+
+        self.frames_displayed = 0
+        self.frames_superseded = 0
+        self.frames_dropped = 0
+
+    def stamp_capture(self):
+        now = time.perf_counter()
+        with self.lock:
+            frame_id = self.next_frame_id
+            self.next_frame_id += 1
+
+            if self.nominal_fps and self.last_capture_time is not None:
+                period = 1.0 / self.nominal_fps
+                missed = int(round((now - self.last_capture_time) / period)) - 1
+                if missed > 0:
+                    self.frames_dropped += missed
+            self.last_capture_time = now
+
+            self.pending[frame_id] = [now, None]
+            # Frames that never reach a display (e.g. a consumer that only
+            # reads stats) must not accumulate forever.
+            while len(self.pending) > self.max_pending:
+                del self.pending[next(iter(self.pending))]
+        return frame_id
+
+    def stamp_filtered(self, frame_id):
+        now = time.perf_counter()
+        with self.lock:
+            stamps = self.pending.get(frame_id)
+            if stamps is not None:
+                stamps[1] = now
+
+    def stamp_displayed(self, frame_id):
+        now = time.perf_counter()
+        with self.lock:
+            stamps = self.pending.pop(frame_id, None)
+            if stamps is None:
+                return
+            self.frames_displayed += 1
+
+        capture_time, filtered_time = stamps
+        self.stats.record("latency.capture_to_display", (now - capture_time) * 1000.0)
+        if filtered_time is not None:
+            self.stats.record("latency.capture_to_filter", (filtered_time - capture_time) * 1000.0)
+            self.stats.record("latency.filter_to_display", (now - filtered_time) * 1000.0)
+
+    def mark_superseded(self, frame_id):
+        with self.lock:
+            if self.pending.pop(frame_id, None) is not None:
+                self.frames_superseded += 1
+
+    def summary(self):
+        with self.lock:
+            return {
+                'frames_displayed': self.frames_displayed,
+                'frames_superseded': self.frames_superseded,
+                'frames_dropped': self.frames_dropped
+            }
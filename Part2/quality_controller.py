@@ -0,0 +1,68 @@
+from collections import deque
+
+# Ordered from best to cheapest. 'scale' multiplies the configured processing
+# width, 'face_detect_interval' is how many frames reuse one Haar detection and
+# 'quality_tier' selects cheaper variants of the heavy filters (see filters.py).
+QUALITY_LEVELS = [
+    {'scale': 1.0, 'face_detect_interval': 1, 'quality_tier': 0},
+    {'scale': 1.0, 'face_detect_interval': 2, 'quality_tier': 0},
+    {'scale': 0.85, 'face_detect_interval': 3, 'quality_tier': 1},
+    {'scale': 0.7, 'face_detect_interval': 4, 'quality_tier': 1},
+    {'scale': 0.5, 'face_detect_interval': 6, 'quality_tier': 2}
+]
+
+
+class AdaptiveQualityController:
+    """Steps quality down when frames overrun the budget and back up when
+    there is headroom.
+
+    Decisions use the mean of the last `window` frame times. Two thresholds
+    around the target (downgrade_ratio above, upgrade_ratio below) plus a
+    cooldown after every change keep the level from oscillating.
+    """
+
+    def __init__(self, target_ms=33.0, levels=None, window=15,
+                 downgrade_ratio=1.0, upgrade_ratio=0.7, cooldown_frames=30):
+        self.target_ms = target_ms
+        self.levels = levels if levels is not None else QUALITY_LEVELS
+        self.window = window
+        self.downgrade_ratio = downgrade_ratio
+        self.upgrade_ratio = upgrade_ratio
+        self.cooldown_frames = cooldown_frames
+
+        self.level_index = 0
+        self.frame_times = deque(maxlen=window)
+        self.frames_since_change = 0
+
+    @property
+    def level(self):
+        return self.levels[self.level_index]
+
+    def average_ms(self):
+        if not self.frame_times:
+            return 0.0
+        return sum(self.frame_times) / len(self.frame_times)
+
+    def update(self, frame_time_ms):
+        """Record one frame time; return the new level if it changed, else None."""
+        self.frame_times.append(frame_time_ms)
+        self.frames_since_change += 1
+
+        if len(self.frame_times) < self.window or self.frames_since_change < self.cooldown_frames:
+            return None
+
+        average = self.average_ms()
+        if average > self.target_ms * self.downgrade_ratio and self.level_index < len(self.levels) - 1:
+            return self.set_level(self.level_index + 1)
+        if average < self.target_ms * self.upgrade_ratio and self.level_index > 0:
+            return self.set_level(self.level_index - 1)
+        return None
+
+    def set_level(self, level_index):
+        self.level_index = max(0, min(level_index, len(self.levels) - 1))
+        self.frame_times.clear()
+        self.frames_since_change = 0
+        return self.level
+
+    def reset(self):
+        return self.set_level(0)
@@ -0,0 +1,99 @@
+import queue
+import threading
+import time
+
+import cv2
+
+
+class VideoRecorder:
+    """Writes frames to a video file from a dedicated encoder thread.
+
+    submit() never blocks the caller: frames go through a bounded queue and,
+    when the encoder falls behind and the queue is full, the new frame is
+    dropped and counted instead of stalling the live preview.
+    """
+
+    def __init__(self, path, fps=30.0, fourcc="mp4v", queue_size=32, stats=None):
+        self.path = path
+        self.fps = fps
+        self.fourcc = fourcc
+        self.stats = stats
+
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.thread = None
+        self.writer = None
+        self.frame_size = None
+
+        self.frames_submitted = 0
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.queue_high_water = 0
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="VideoRecorder")
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def submit(self, frame):
+        self.frames_submitted += 1
+        try:
+            self.queue.put_nowait(frame)
+        except queue.Full:
+            self.frames_dropped += 1
+            return False
+
+        depth = self.queue.qsize()
+        if depth > self.queue_high_water:
+            self.queue_high_water = depth
+        return True
+
+    def stop(self):
+        if self.thread is not None:
+            # The sentinel must get through even if the queue is full
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+        return self.summary()
+
+    def is_recording(self):
+        return self.thread is not None
+
+    def summary(self):
+        return {
+            'path': self.path,
+            'frames_submitted': self.frames_submitted,
+            'frames_written': self.frames_written,
+            'frames_dropped': self.frames_dropped,
+            'queue_depth': self.queue.qsize(),
+            'queue_high_water': self.queue_high_water,
+            'queue_size': self.queue.maxsize
+        }
+
+    def _run(self):
+        try:
+            while True:
+                frame = self.queue.get()
+                if frame is None:
+                    break
+
+                height, width = frame.shape[:2]
+                if self.writer is None:
+                    # The frame size is only known once the first frame arrives
+                    self.frame_size = (width, height)
+                    self.writer = cv2.VideoWriter(
+                        self.path, cv2.VideoWriter_fourcc(*self.fourcc), self.fps, self.frame_size
+                    )
+                elif (width, height) != self.frame_size:
+                    # Adaptive quality can change the processing size mid-recording
+                    frame = cv2.resize(frame, self.frame_size, interpolation=cv2.INTER_LINEAR)
+
+                start_time = time.perf_counter()
+                self.writer.write(frame)
+                if self.stats is not None:
+                    self.stats.record("encode", (time.perf_counter() - start_time) * 1000.0)
+                self.frames_written += 1
+        finally:
+            if self.writer is not None:
+                self.writer.release()
+                self.writer = None
@@ -0,0 +1,105 @@
+import cv2
+import numpy as np
+
+# Filters whose output depends only on the input frame and the parameters.
+DETERMINISTIC_FILTERS = {1, 2, 3, 4, 5, 6, 7}
+
+# Per-pixel filters without a position-dependent term: a changed region can be
+# refiltered on its own and pasted into the previous output.
+POINTWISE_FILTERS = {2, 6}
+
+
+class StaticSceneCache:
+    """Reuses the previous filtered output while the camera view is static.
+
+    Each frame is reduced to a small grayscale thumbnail and compared, block
+    by block, against the thumbnail of the frame the cached output was made
+    from. If no thumbnail cell moved more than `threshold` grey levels and
+    the filter and parameter version are unchanged, the cached output is
+    returned. For pointwise filters only the changed blocks are refiltered.
+    """
+
+    def __init__(self, threshold=3.0, grid=(8, 6), cells_per_block=4, max_partial_ratio=0.5):
+        self.threshold = threshold
+        self.grid = grid
+        self.cells_per_block = cells_per_block
+        self.max_partial_ratio = max_partial_ratio
+
+        self.key = None
+        self.reference = None
+        self.output = None
+
+        self.frames_reused = 0
+        self.frames_partial = 0
+        self.frames_full = 0
+
+    def thumbnail(self, frame):
+        cols, rows = self.grid
+        size = (cols * self.cells_per_block, rows * self.cells_per_block)
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        return cv2.resize(gray, size, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+    def changed_blocks(self, thumbnail):
+        cols, rows = self.grid
+        cell = self.cells_per_block
+        diff = np.abs(thumbnail - self.reference).reshape(rows, cell, cols, cell)
+        # A block counts as changed if any of its thumbnail cells moved, so
+        # small objects leaving a block are not averaged away
+        return diff.max(axis=(1, 3)) > self.threshold
+
+    def block_bounds(self, row, col, shape):
+        cols, rows = self.grid
+        height, width = shape[:2]
+        y0, y1 = row * height // rows, (row + 1) * height // rows
+        x0, x1 = col * width // cols, (col + 1) * width // cols
+        return y0, y1, x0, x1
+
+    def process(self, frame, filter_index, params, apply):
+        """Return the filtered frame, calling apply(frame, params) only when needed."""
+        if filter_index not in DETERMINISTIC_FILTERS:
+            self.key = None
+            return apply(frame, params)
+
+        key = (filter_index, getattr(params, 'version', None), frame.shape)
+        thumbnail = self.thumbnail(frame)
+
+        if key != self.key or key[1] is None:
+            return self._full(frame, params, apply, key, thumbnail)
+
+        changed = self.changed_blocks(thumbnail)
+        changed_count = int(changed.sum())
+        if changed_count == 0:
+            self.frames_reused += 1
+            return self.output.copy()
+
+        if filter_index in POINTWISE_FILTERS and changed_count <= changed.size * self.max_partial_ratio:
+            cell = self.cells_per_block
+            for row, col in zip(*np.nonzero(changed)):
+                y0, y1, x0, x1 = self.block_bounds(row, col, frame.shape)
+                self.output[y0:y1, x0:x1] = apply(frame[y0:y1, x0:x1], params)
+                self.reference[row * cell:(row + 1) * cell, col * cell:(col + 1) * cell] = \
+                    thumbnail[row * cell:(row + 1) * cell, col * cell:(col + 1) * cell]
+            self.frames_partial += 1
+            return self.output.copy()
+
+        return self._full(frame, params, apply, key, thumbnail)
+
+    def _full(self, frame, params, apply, key, thumbnail):
+        output = apply(frame, params)
+        self.key = key
+        self.reference = thumbnail
+        self.output = output.copy()
+        self.frames_full += 1
+        return output
+
+    def reset(self):
+        self.key = None
+        self.reference = None
+        self.output = None
+
+    def summary(self):
+        return {
+            'scene_reused': self.frames_reused,
+            'scene_partial': self.frames_partial,
+            'scene_full': self.frames_full
+        }
@@ -0,0 +1,211 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+
+BOUNDARY = "frame"
+
+INDEX_PAGE = b"""<!DOCTYPE html>
+<html><head><title>Video Filter Studio</title>
+<style>body{margin:0;background:#000}img{width:100vw;height:100vh;object-fit:contain}</style>
+</head><body><img src="/stream.mjpg"></body></html>
+"""
+
+
+class FrameBroadcaster:
+    """Encodes the newest frame once and shares the JPEG with every client.
+
+    publish() only stores a reference to the frame, so the processing thread
+    never waits for JPEG encoding. A dedicated encoder thread compresses the
+    latest frame whenever at least one client is connected; clients always
+    take the newest buffer, so a slow client simply skips frames. When the
+    last client leaves, the buffered frames are dropped, so a client that
+    connects later never gets a picture from an earlier session.
+    """
+
+    def __init__(self, quality=80):
+        self.quality = quality
+        self.condition = threading.Condition()
+
+        self.pending_frame = None
+        self.jpeg = None
+        self.sequence = 0
+        self.clients = 0
+        self.is_running = False
+        self.thread = None
+
+        self.frames_published = 0
+        self.frames_encoded = 0
+
+    def start(self):
+        self.is_running = True
+        self.thread = threading.Thread(target=self._encode_frames, name="mjpeg-encoder")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        with self.condition:
+            self.is_running = False
+            self.condition.notify_all()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def publish(self, frame):
+        with self.condition:
+            self.pending_frame = frame
+            self.frames_published += 1
+            self.condition.notify_all()
+
+    def _encode_frames(self):
+        params = [cv2.IMWRITE_JPEG_QUALITY, self.quality]
+        while True:
+            with self.condition:
+                while self.is_running and (self.pending_frame is None or self.clients == 0):
+                    self.condition.wait()
+                if not self.is_running:
+                    return
+                frame = self.pending_frame
+                self.pending_frame = None
+
+            ok, buffer = cv2.imencode(".jpg", frame, params)
+            if not ok:
+                continue
+
+            with self.condition:
+                if self.clients == 0:
+                    continue
+                self.jpeg = buffer.tobytes()
+                self.sequence += 1
+                self.frames_encoded += 1
+                self.condition.notify_all()
+
+    def add_client(self):
+        with self.condition:
+            self.clients += 1
+            self.condition.notify_all()
+
+    def remove_client(self):
+        with self.condition:
+            self.clients -= 1
+            if self.clients == 0:
+                self.pending_frame = None
+                self.jpeg = None
+
+    def wait_for_frame(self, last_sequence, timeout=1.0):
+        """Return (sequence, jpeg) newer than last_sequence, or None on timeout/stop."""
+        with self.condition:
+            has_frame = lambda: self.jpeg is not None and self.sequence != last_sequence
+            self.condition.wait_for(lambda: has_frame() or not self.is_running, timeout=timeout)
+            if not self.is_running or not has_frame():
+                return None
+            return self.sequence, self.jpeg
+
+    def summary(self):
+        with self.condition:
+            return {
+                'clients': self.clients,
+                'frames_published': self.frames_published,
+                'frames_encoded': self.frames_encoded
+            }
+
+
+def make_handler(broadcaster):
+    class StreamHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path in ("/", "/index.html"):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html")
+                self.send_header("Content-Length", str(len(INDEX_PAGE)))
+                self.end_headers()
+                self.wfile.write(INDEX_PAGE)
+            elif self.path == "/stream.mjpg":
+                self.stream()
+            elif self.path == "/snapshot.jpg":
+                self.snapshot()
+            else:
+                self.send_error(404)
+
+        def stream(self):
+            self.send_response(200)
+            self.send_header("Cache-Control", "no-cache, private")
+            self.send_header("Pragma", "no-cache")
+            self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+            self.end_headers()
+
+            broadcaster.add_client()
+            try:
+                sequence = 0
+                while broadcaster.is_running:
+                    result = broadcaster.wait_for_frame(sequence)
+                    if result is None:
+                        continue
+                    sequence, jpeg = result
+                    self.wfile.write(
+                        f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                        f"Content-Length: {len(jpeg)}\r\n\r\n".encode("ascii")
+                    )
+                    self.wfile.write(jpeg)
+                    self.wfile.write(b"\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            finally:
+                broadcaster.remove_client()
+
+        def snapshot(self):
+            broadcaster.add_client()
+            try:
+                result = broadcaster.wait_for_frame(0, timeout=2.0)
+            finally:
+                broadcaster.remove_client()
+            if result is None:
+                self.send_error(503, "No frame available")
+                return
+
+            _, jpeg = result
+            self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            self.send_header("Content-Length", str(len(jpeg)))
+            self.end_headers()
+            self.wfile.write(jpeg)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StreamHandler
+
+
+class MJPEGStreamServer:
+    """Serves the filtered feed as MJPEG on http://host:port/stream.mjpg.
+
+    Only this machine can connect by default; pass host="0.0.0.0" (or an
+    interface address) to make the camera feed reachable over the network.
+    """
+
+    def __init__(self, host="127.0.0.1", port=8080, quality=80):
+        self.broadcaster = FrameBroadcaster(quality=quality)
+        self.server = ThreadingHTTPServer((host, port), make_handler(self.broadcaster))
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    def start(self):
+        self.broadcaster.start()
+        self.thread = threading.Thread(target=self.server.serve_forever, name="mjpeg-server")
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def publish(self, frame):
+        self.broadcaster.publish(frame)
+
+    def stop(self):
+        self.broadcaster.stop()
+        self.server.shutdown()
+        self.server.server_close()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
@@ -0,0 +1,61 @@
+import cv2
+import numpy as np
+
+
+def draw_face(frame, cx, cy, size):
+    """Draw a simple frontal face the Haar cascade reliably detects."""
+    s = size
+    cv2.ellipse(frame, (cx, cy), (s, int(s * 1.3)), 0, 0, 360, (150, 180, 215), -1)
+    for side in (-1, 1):
+        eye_x = cx + side * int(s * 0.4)
+        cv2.ellipse(frame, (eye_x, cy - int(s * 0.25)), (int(s * 0.2), int(s * 0.1)), 0, 0, 360, (40, 40, 40), -1)
+        cv2.line(frame, (cx + side * int(s * 0.2), cy - int(s * 0.5)),
+                 (cx + side * int(s * 0.6), cy - int(s * 0.5)), (30, 30, 30), max(1, int(s * 0.08)))
+    cv2.ellipse(frame, (cx, cy + int(s * 0.15)), (int(s * 0.08), int(s * 0.2)), 0, 0, 360, (120, 140, 180), -1)
+    cv2.ellipse(frame, (cx, cy + int(s * 0.6)), (int(s * 0.35), int(s * 0.1)), 0, 0, 360, (60, 60, 140), -1)
+    return frame
+
+
+def synthetic_frame(width=640, height=480, faces=1, index=0, seed=0):
+    """One deterministic BGR frame: textured background plus `faces` faces
+    that drift slowly with `index`."""
+    rng = np.random.default_rng(seed + index)
+
+    frame = np.empty((height, width, 3), dtype=np.uint8)
+    frame[:] = (90, 110, 130)
+    gradient = np.linspace(0, 60, width, dtype=np.float32)
+    frame[:, :, 1] = np.clip(frame[:, :, 1] + gradient, 0, 255).astype(np.uint8)
+
+    if faces:
+        columns = int(np.ceil(np.sqrt(faces)))
+        rows = int(np.ceil(faces / columns))
+        size = max(12, int(min(width / columns, height / rows) * 0.25))
+        for face in range(faces):
+            row, column = divmod(face, columns)
+            cx = int((column + 0.5) * width / columns + np.sin(index / 10.0 + face) * size * 0.3)
+            cy = int((row + 0.5) * height / rows + np.cos(index / 12.0 + face) * size * 0.2)
+            draw_face(frame, cx, cy, size)
+
+    frame = cv2.GaussianBlur(frame, (5, 5), 0)
+    # Mild sensor noise so nothing is perfectly static
+    noise = rng.integers(-4, 5, size=frame.shape, dtype=np.int16)
+    return np.clip(frame.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+def synthetic_clip(frames=120, width=640, height=480, faces=1, seed=0):
+    return [synthetic_frame(width, height, faces, index, seed) for index in range(frames)]
+
+
+def load_clip(path, max_frames=None):
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"Cannot open clip: {path}")
+
+    frames = []
+    while max_frames is None or len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
@@ -0,0 +1,23 @@
+import pytest
+
+from synthetic import synthetic_frame
+from video_engine import TRANSITION_TYPES, VideoEngine
+
+
+@pytest.mark.parametrize("transition_type", sorted(TRANSITION_TYPES))
+def test_quality_change_during_transition(transition_type):
+    engine = VideoEngine(processing_width=320)
+    engine.set_transition_type(transition_type)
+    engine.set_filter(0, animate=False)
+    engine.set_filter(2)
+    # Long enough that the transition is still running on every frame below
+    engine.transition.transition_time = 60.0
+
+    frame = synthetic_frame(640, 360, faces=0)
+    _, output = engine.process_frame(frame)
+    assert output.shape == (180, 320, 3)
+
+    engine.apply_quality_level({'scale': 0.5, 'face_detect_interval': 1, 'quality_tier': 1})
+    assert engine.transition.is_transitioning
+    _, output = engine.process_frame(frame)
+    assert output.shape == (90, 160, 3)
@@ -1,7 +1,6 @@
 import os
 import cv2
 import datetime
-from tkinter import messagebox
 
 def ensure_screenshot_directory(folder_name="screenshots"):
     os.makedirs(folder_name, exist_ok=True)
@@ -23,7 +22,21 @@ def save_screenshot(folder, original_frame, filtered_frame, filter_index, filter
 
     return original_filename, filtered_filename
 
+def recording_filename(folder):
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    return f"{folder}/recording_{timestamp}.mp4"
+
+def save_pipeline_stats(folder, stats):
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    json_filename = stats.dump_json(f"{folder}/latency_{timestamp}.json")
+    csv_filename = stats.dump_csv(f"{folder}/latency_{timestamp}.csv")
+
+    return json_filename, csv_filename
+
 def show_error(message):
+    from tkinter import messagebox
+
     messagebox.showerror("Error", message)
 
 def calculate_fps(frame_count, last_time):
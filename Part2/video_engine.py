@@ -0,0 +1,271 @@
+import cv2
+import threading
+import time
+
+from filters import apply_filter
+from face_detection import FaceDetector
+from quality_controller import AdaptiveQualityController
+from pipeline_stats import PipelineStats, FrameLatencyTracker
+from filter_params import ParamSnapshot
+from scene_cache import StaticSceneCache
+from frame_arena import FrameArena
+from utils import calculate_fps
+from filter_transitions import FadeTransition, WipeTransition, ZoomTransition, DissolveTransition
+
+DEFAULT_PARAMS = {
+    'grayscale_levels': 8,
+    'edge_threshold1': 100,
+    'edge_threshold2': 200,
+    'blur_kernel_size': 9,
+    'cartoon_edges_threshold': 9,
+    'cartoon_color_sigma': 250,
+    'vignette_sigma': 200,
+    'pixel_size': 15,
+    'blur_level': 25,
+    'quality_tier': 0
+}
+
+TRANSITION_TYPES = {
+    "fade": (FadeTransition, 0.8),
+    "wipe": (WipeTransition, 0.8),
+    "zoom": (ZoomTransition, 1.0),
+    "dissolve": (DissolveTransition, 0.8)
+}
+
+
+class VideoEngine:
+    """Headless processing core: frames in, filtered frames and stats out.
+
+    Holds the filter selection, its parameters and the active transition.
+    It has no Tk dependency, so the same effects can be driven from the GUI,
+    from scripts on machines without a display, or from tests.
+    """
+
+    def __init__(self, processing_width=480):
+        self.processing_width = processing_width
+        self.frame_size = None
+        self._source_shape = None
+
+        self.quality_controller = None
+        self.quality_scale = 1.0
+        self.stats = PipelineStats()
+        self.show_stats_overlay = False
+        self.latency = FrameLatencyTracker(self.stats)
+        self.last_frame_id = None
+        self.face_detector = FaceDetector(stats=self.stats)
+        self.scene_cache = None
+        self.last_frame_ms = 0.0
+        # Scratch buffers for the per-frame temporaries of this engine's
+        # pipeline. Frames handed to on_frame are never borrowed from it.
+        self.arena = FrameArena()
+
+        self.current_filter = 0
+        # Replaced wholesale on every change, never mutated in place. Writers
+        # (Tk callbacks, the quality controller) serialise on params_lock;
+        # the processing thread just reads the attribute once per frame.
+        self.params = ParamSnapshot(DEFAULT_PARAMS)
+        self.params_lock = threading.Lock()
+
+        self.transition_type = "fade"
+        self.transition = FadeTransition(transition_time=0.8)
+
+        self.current_frame = None
+        self.is_running = False
+
+        self.fps = 0
+        self.frame_count = 0
+        self.frames_processed = 0
+        self.last_time = cv2.getTickCount() / cv2.getTickFrequency()
+
+    def set_filter(self, filter_index, animate=True):
+        if animate and self.current_filter != filter_index:
+            params = self.get_current_params()
+
+            self.transition.start_transition(
+                from_filter=self.current_filter,
+                to_filter=filter_index,
+                from_params=params,
+                to_params=params
+            )
+
+        self.current_filter = filter_index
+
+    def set_processing_width(self, processing_width):
+        self.processing_width = processing_width
+        self._source_shape = None
+
+    def enable_adaptive_quality(self, target_ms=33.0, **kwargs):
+        self.quality_controller = AdaptiveQualityController(target_ms=target_ms, **kwargs)
+        self.apply_quality_level(self.quality_controller.level)
+
+    def enable_static_scene_reuse(self, threshold=3.0):
+        self.scene_cache = StaticSceneCache(threshold=threshold)
+
+    def disable_static_scene_reuse(self):
+        self.scene_cache = None
+
+    def disable_adaptive_quality(self):
+        self.quality_controller = None
+        self.apply_quality_level({'scale': 1.0, 'face_detect_interval': 1, 'quality_tier': 0})
+
+    def apply_quality_level(self, level):
+        if level['scale'] != self.quality_scale:
+            self.quality_scale = level['scale']
+            self._source_shape = None
+        self.face_detector.interval = level['face_detect_interval']
+        self.update_params(quality_tier=level['quality_tier'])
+
+    def get_processing_size(self, frame):
+        # Cached per input shape: the source resolution rarely changes.
+        if frame.shape[:2] != self._source_shape:
+            height, width = frame.shape[:2]
+            target_width = min(int(self.processing_width * self.quality_scale), width)
+            target_height = max(1, int(round(height * target_width / width)))
+            self._source_shape = frame.shape[:2]
+            self.frame_size = (target_width, target_height)
+            self.arena.clear()
+        return self.frame_size
+
+    def set_param(self, name, value):
+        if name not in self.params:
+            raise KeyError(f"Unknown filter parameter: {name}")
+        self.update_params(**{name: value})
+
+    def update_params(self, **changes):
+        with self.params_lock:
+            self.params = self.params.replace(**changes)
+        return self.params
+
+    def get_current_params(self):
+        return self.params
+
+    def set_transition_type(self, transition_type):
+        if transition_type not in TRANSITION_TYPES:
+            raise ValueError(f"Unknown transition type: {transition_type}")
+
+        transition_class, transition_time = TRANSITION_TYPES[transition_type]
+        self.transition_type = transition_type
+        self.transition = transition_class(transition_time=transition_time)
+
+    def process_frame(self, frame, frame_id=None):
+        """Filter one BGR frame and return (original_display, output).
+
+        frame_id comes from latency.stamp_capture(); frames without one are
+        stamped here. The id stays in last_frame_id so the consumer can
+        report when the frame is actually shown.
+        """
+        start_time = time.perf_counter()
+
+        if frame_id is None:
+            frame_id = self.latency.stamp_capture()
+        self.last_frame_id = frame_id
+
+        self.current_frame = frame.copy()
+
+        resized = None
+        with self.stats.time("resize"):
+            frame_size = self.get_processing_size(frame)
+            if frame_size != (frame.shape[1], frame.shape[0]):
+                resized = self.arena.acquire((frame_size[1], frame_size[0]) + frame.shape[2:], frame.dtype)
+                frame = cv2.resize(frame, frame_size, dst=resized, interpolation=cv2.INTER_AREA)
+
+        try:
+            original_display, output = self._process_resized(frame, start_time)
+        finally:
+            if resized is not None:
+                self.arena.release(resized)
+
+        self.latency.stamp_filtered(frame_id)
+
+        self.frames_processed += 1
+        fps_result, self.frame_count, self.last_time = calculate_fps(
+            self.frame_count, self.last_time
+        )
+        if fps_result is not None:
+            self.fps = fps_result
+
+        return original_display, output
+
+    def _process_resized(self, frame, start_time):
+        original_display = frame.copy()
+
+        params = self.params
+
+        # Check if we're in a transition
+        if self.transition.is_transitioning:
+            self.transition.update()
+
+            with self.stats.time(f"transition[{self.transition_type}]"):
+                output = self.transition.apply(frame, self.arena)
+
+            # If transition returned None, it's complete, so apply the current filter
+            if output is None:
+                output = self.apply_current_filter(frame, params)
+        else:
+            output = self.apply_current_filter(frame, params)
+
+        self.last_frame_ms = (time.perf_counter() - start_time) * 1000.0
+        if self.quality_controller is not None:
+            level = self.quality_controller.update(self.last_frame_ms)
+            if level is not None:
+                self.apply_quality_level(level)
+
+        if self.show_stats_overlay:
+            self.stats.draw_overlay(output)
+
+        return original_display, output
+
+    def apply_current_filter(self, frame, params):
+        with self.stats.time(f"filter[{self.current_filter}]"):
+            if self.scene_cache is not None:
+                return self.scene_cache.process(frame, self.current_filter, params, self._filter)
+            return self._filter(frame, params)
+
+    def _filter(self, frame, params):
+        return apply_filter(frame, self.current_filter, params, self.face_detector, self.arena)
+
+    def get_stats(self):
+        return {
+            'fps': self.fps,
+            'frames_processed': self.frames_processed,
+            'frame_ms': self.last_frame_ms,
+            'quality_level': self.quality_controller.level_index if self.quality_controller else 0,
+            'params_version': self.params.version,
+            'filter': self.current_filter,
+            'transition': self.transition_type,
+            'transitioning': self.transition.is_transitioning,
+            'stages': self.stats.summary(),
+            **self.latency.summary(),
+            **self.arena.summary(),
+            **(self.scene_cache.summary() if self.scene_cache is not None else {})
+        }
+
+    def run(self, source, on_frame=None, max_frames=None):
+        """Pull frames from any object with a cv2.VideoCapture-style read().
+
+        Returns False if the source stopped delivering frames, True if the
+        loop ended because of stop() or max_frames.
+        """
+        self.is_running = True
+        processed = 0
+        while self.is_running:
+            with self.stats.time("capture"):
+                ret, frame = source.read()
+            if not ret:
+                self.is_running = False
+                return False
+            frame_id = self.latency.stamp_capture()
+
+            original_display, output = self.process_frame(frame, frame_id)
+            if on_frame is not None:
+                on_frame(original_display, output)
+
+            processed += 1
+            if max_frames is not None and processed >= max_frames:
+                break
+
+        self.is_running = False
+        return True
+
+    def stop(self):
+        self.is_running = False
@@ -5,13 +5,18 @@ from PIL import Image
 import threading
 import os
 
-from filters import apply_filter
 from ui_components import create_fonts, create_main_layout, create_video_displays, create_filter_selection
-from utils import ensure_screenshot_directory, save_screenshot, show_error, calculate_fps
-from filter_transitions import FadeTransition, WipeTransition, ZoomTransition, DissolveTransition
+from utils import ensure_screenshot_directory, save_screenshot, save_pipeline_stats, recording_filename, show_error
+from video_engine import VideoEngine
+from face_detection import warm_up
+from capture import open_capture
+from recorder import VideoRecorder
+from stream_server import MJPEGStreamServer
 
 class VideoFilterApp:
-    def __init__(self, window, window_title):
+    def __init__(self, window, window_title, capture_settings=None, processing_width=480,
+                 target_frame_ms=None, static_scene_threshold=None, stream_port=None, stream_host="127.0.0.1",
+                 on_first_frame=None):
         self.window = window
         self.window.title(window_title)
         self.window.configure(bg="#f0f0f0")
@@ -19,16 +24,35 @@ class VideoFilterApp:
 
         self.fonts = create_fonts()
 
+        self.engine = VideoEngine(processing_width=processing_width)
+        if target_frame_ms is not None:
+            self.engine.enable_adaptive_quality(target_frame_ms)
+        if static_scene_threshold is not None:
+            self.engine.enable_static_scene_reuse(static_scene_threshold)
+
         self.init_parameters()
 
         self.screenshot_folder = ensure_screenshot_directory()
+        self.recorder = None
+
+        self.stream_server = None
+        if stream_port is not None:
+            self.stream_server = MJPEGStreamServer(host=stream_host, port=stream_port).start()
 
         self.create_widgets()
+        self.on_first_frame = on_first_frame
+        self.window.after_idle(self.start_warm_up)
 
-        self.cap = cv2.VideoCapture(0)
+        self.cap = open_capture(capture_settings)
         if not self.cap.isOpened():
             show_error("Cannot open camera")
             return
+        self.engine.latency.nominal_fps = self.cap.get(cv2.CAP_PROP_FPS) or None
+
+        # Only the newest converted frame waits for the Tk thread; older ones
+        # are superseded instead of queueing up behind it.
+        self.display_lock = threading.Lock()
+        self.pending_display = None
 
         self.is_running = True
         self.thread = threading.Thread(target=self.process_video)
@@ -37,26 +61,16 @@ class VideoFilterApp:
 
         self.window.protocol("WM_DELETE_WINDOW", self.on_closing)
 
-        self.fps = 0
-        self.frame_count = 0
-        self.last_time = cv2.getTickCount() / cv2.getTickFrequency()
-
         self.update_status()
 
+    def start_warm_up(self):
+        # Face cascades load in the background once the window
+        # is up, so the first face filter frame does not pay for them.
+        warm_up_thread = threading.Thread(target=warm_up, name="warm-up")
+        warm_up_thread.daemon = True
+        warm_up_thread.start()
+
     def init_parameters(self):
-        self.current_filter = 0
-        self.grayscale_levels = 8
-        self.edge_threshold1 = 100
-        self.edge_threshold2 = 200
-        self.blur_kernel_size = 9
-        self.cartoon_edges_threshold = 9
-        self.cartoon_color_sigma = 250
-        self.vignette_sigma = 200
-        self.pixel_size = 15
-        self.blur_level = 25
-
-        self.transition = FadeTransition(transition_time=0.8)
-        self.transition_type = "fade"
         overlays_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'overlays')
         os.makedirs(overlays_dir, exist_ok=True)
 
@@ -65,7 +79,7 @@ class VideoFilterApp:
 
         self.video_displays = create_video_displays(self.frames['videos_frame'], self.fonts)
 
-        self.filter_var = tk.IntVar(value=self.current_filter)
+        self.filter_var = tk.IntVar(value=self.engine.current_filter)
 
         create_filter_selection(self.frames['control_frame'], self.fonts, self.filter_var, self.set_filter)
 
@@ -126,10 +140,10 @@ class VideoFilterApp:
             number_of_steps=30,
             command=self.update_grayscale_levels
         )
-        self.levels_slider.set(self.grayscale_levels)
+        self.levels_slider.set(self.engine.params['grayscale_levels'])
         self.levels_slider.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 10))
 
-        self.levels_value = ctk.CTkLabel(levels_frame, text=str(self.grayscale_levels), width=30)
+        self.levels_value = ctk.CTkLabel(levels_frame, text=str(self.engine.params['grayscale_levels']), width=30)
         self.levels_value.pack(side=tk.RIGHT)
 
     def create_edge_controls(self, parent):
@@ -156,10 +170,10 @@ class VideoFilterApp:
             number_of_steps=255,
             command=self.update_edge_threshold1
         )
-        self.edge_slider1.set(self.edge_threshold1)
+        self.edge_slider1.set(self.engine.params['edge_threshold1'])
         self.edge_slider1.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 10))
 
-        self.edge_value1 = ctk.CTkLabel(thresh1_frame, text=str(self.edge_threshold1), width=30)
+        self.edge_value1 = ctk.CTkLabel(thresh1_frame, text=str(self.engine.params['edge_threshold1']), width=30)
         self.edge_value1.pack(side=tk.RIGHT)
 
         thresh2_frame = ctk.CTkFrame(self.edge_frame, fg_color="transparent")
@@ -175,10 +189,10 @@ class VideoFilterApp:
             number_of_steps=255,
             command=self.update_edge_threshold2
         )
-        self.edge_slider2.set(self.edge_threshold2)
+        self.edge_slider2.set(self.engine.params['edge_threshold2'])
         self.edge_slider2.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 10))
 
-        self.edge_value2 = ctk.CTkLabel(thresh2_frame, text=str(self.edge_threshold2), width=30)
+        self.edge_value2 = ctk.CTkLabel(thresh2_frame, text=str(self.engine.params['edge_threshold2']), width=30)
         self.edge_value2.pack(side=tk.RIGHT)
 
     def create_blur_controls(self, parent):
@@ -202,10 +216,10 @@ class VideoFilterApp:
             number_of_steps=12,
             command=self.update_blur_kernel
         )
-        self.blur_slider.set(self.blur_kernel_size)
+        self.blur_slider.set(self.engine.params['blur_kernel_size'])
         self.blur_slider.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 10))
 
-        self.blur_value = ctk.CTkLabel(blur_control_frame, text=str(self.blur_kernel_size), width=30)
+        self.blur_value = ctk.CTkLabel(blur_control_frame, text=str(self.engine.params['blur_kernel_size']), width=30)
         self.blur_value.pack(side=tk.RIGHT)
 
     def create_cartoon_controls(self, parent):
@@ -232,10 +246,10 @@ class VideoFilterApp:
             number_of_steps=6,
             command=self.update_cartoon_edge
         )
-        self.cartoon_edge_slider.set(self.cartoon_edges_threshold)
+        self.cartoon_edge_slider.set(self.engine.params['cartoon_edges_threshold'])
         self.cartoon_edge_slider.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 10))
 
-        self.cartoon_edge_value = ctk.CTkLabel(cartoon_edge_frame, text=str(self.cartoon_edges_threshold), width=30)
+        self.cartoon_edge_value = ctk.CTkLabel(cartoon_edge_frame, text=str(self.engine.params['cartoon_edges_threshold']), width=30)
         self.cartoon_edge_value.pack(side=tk.RIGHT)
 
         cartoon_color_frame = ctk.CTkFrame(self.cartoon_frame, fg_color="transparent")
@@ -251,10 +265,10 @@ class VideoFilterApp:
             number_of_steps=25,
             command=self.update_cartoon_color
         )
-        self.cartoon_color_slider.set(self.cartoon_color_sigma)
+        self.cartoon_color_slider.set(self.engine.params['cartoon_color_sigma'])
         self.cartoon_color_slider.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 10))
 
-        self.cartoon_color_value = ctk.CTkLabel(cartoon_color_frame, text=str(self.cartoon_color_sigma), width=30)
+        self.cartoon_color_value = ctk.CTkLabel(cartoon_color_frame, text=str(self.engine.params['cartoon_color_sigma']), width=30)
         self.cartoon_color_value.pack(side=tk.RIGHT)
 
     def create_action_buttons(self):
@@ -273,6 +287,18 @@ class VideoFilterApp:
         )
         self.screenshot_btn.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
 
+        self.record_btn = ctk.CTkButton(
+            button_frame,
+            text="Record",
+            command=self.toggle_recording,
+            font=self.fonts['button'],
+            height=40,
+            corner_radius=8,
+            fg_color=("#059669", "#10b981"),
+            hover_color=("#047857", "#059669")
+        )
+        self.record_btn.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+
         exit_btn = ctk.CTkButton(
             button_frame,
             text="Exit",
@@ -285,6 +311,29 @@ class VideoFilterApp:
         )
         exit_btn.pack(side=tk.RIGHT, padx=5, fill=tk.X, expand=True)
 
+        diagnostics_frame = ctk.CTkFrame(self.frames['control_frame'], fg_color="transparent")
+        diagnostics_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
+
+        self.overlay_var = tk.BooleanVar(value=self.engine.show_stats_overlay)
+        overlay_switch = ctk.CTkSwitch(
+            diagnostics_frame,
+            text="Latency Overlay",
+            variable=self.overlay_var,
+            command=self.toggle_stats_overlay,
+            font=self.fonts['label']
+        )
+        overlay_switch.pack(side=tk.LEFT, padx=5)
+
+        stats_btn = ctk.CTkButton(
+            diagnostics_frame,
+            text="Export Stats",
+            command=self.export_stats,
+            font=self.fonts['button'],
+            height=32,
+            corner_radius=8
+        )
+        stats_btn.pack(side=tk.RIGHT, padx=5)
+
     def create_help_section(self):
         help_frame = ctk.CTkFrame(
             self.frames['control_frame'],
@@ -339,10 +388,10 @@ class VideoFilterApp:
             number_of_steps=35,
             command=self.update_vignette_sigma
         )
-        self.vignette_slider.set(self.vignette_sigma)
+        self.vignette_slider.set(self.engine.params['vignette_sigma'])
         self.vignette_slider.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 10))
 
-        self.vignette_value = ctk.CTkLabel(vignette_control_frame, text=str(self.vignette_sigma), width=30)
+        self.vignette_value = ctk.CTkLabel(vignette_control_frame, text=str(self.engine.params['vignette_sigma']), width=30)
         self.vignette_value.pack(side=tk.RIGHT)
 
     def create_face_filter_controls(self, parent):
@@ -369,10 +418,10 @@ class VideoFilterApp:
             number_of_steps=25,
             command=self.update_pixel_size
         )
-        self.pixel_slider.set(self.pixel_size)
+        self.pixel_slider.set(self.engine.params['pixel_size'])
         self.pixel_slider.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 10))
 
-        self.pixel_value = ctk.CTkLabel(pixelate_frame, text=str(self.pixel_size), width=30)
+        self.pixel_value = ctk.CTkLabel(pixelate_frame, text=str(self.engine.params['pixel_size']), width=30)
         self.pixel_value.pack(side=tk.RIGHT)
 
         blur_face_frame = ctk.CTkFrame(self.face_filter_frame, fg_color="transparent")
@@ -388,10 +437,10 @@ class VideoFilterApp:
             number_of_steps=20,
             command=self.update_blur_level
         )
-        self.blur_face_slider.set(self.blur_level)
+        self.blur_face_slider.set(self.engine.params['blur_level'])
         self.blur_face_slider.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 10))
 
-        self.blur_face_value = ctk.CTkLabel(blur_face_frame, text=str(self.blur_level), width=30)
+        self.blur_face_value = ctk.CTkLabel(blur_face_frame, text=str(self.engine.params['blur_level']), width=30)
         self.blur_face_value.pack(side=tk.RIGHT)
 
     def create_transition_controls(self):
@@ -447,104 +496,75 @@ class VideoFilterApp:
         self.cartoon_frame.pack_forget()
         self.vignette_frame.pack_forget()
         self.face_filter_frame.pack_forget()
-        if self.current_filter == 1:
+        current_filter = self.engine.current_filter
+        if current_filter == 1:
             self.edge_frame.pack(fill=tk.X, pady=5)
-        elif self.current_filter == 2:
+        elif current_filter == 2:
             self.grayscale_frame.pack(fill=tk.X, pady=5)
-        elif self.current_filter == 4:
+        elif current_filter == 4:
             self.blur_frame.pack(fill=tk.X, pady=5)
-        elif self.current_filter == 5:
+        elif current_filter == 5:
             self.cartoon_frame.pack(fill=tk.X, pady=5)
-        elif self.current_filter == 7:
+        elif current_filter == 7:
             self.vignette_frame.pack(fill=tk.X, pady=5)
-        elif self.current_filter >= 10 and self.current_filter < 20:
+        elif current_filter >= 10 and current_filter < 20:
             self.face_filter_frame.pack(fill=tk.X, pady=5)
 
     def set_filter(self, filter_index):
-        if self.current_filter != filter_index:
-            params = self.get_current_params()
-
-            self.transition.start_transition(
-                from_filter=self.current_filter,
-                to_filter=filter_index,
-                from_params=params,
-                to_params=params
-            )
-
-        self.current_filter = filter_index
+        self.engine.set_filter(filter_index)
         self.update_parameter_visibility()
         self.update_status_text()
 
     def set_transition_type(self):
-        transition_type = self.transition_var.get()
-        self.transition_type = transition_type
-
-        if transition_type == "fade":
-            self.transition = FadeTransition(transition_time=0.8)
-        elif transition_type == "wipe":
-            self.transition = WipeTransition(transition_time=0.8)
-        elif transition_type == "zoom":
-            self.transition = ZoomTransition(transition_time=1.0)
-        elif transition_type == "dissolve":
-            self.transition = DissolveTransition(transition_time=0.8)
+        self.engine.set_transition_type(self.transition_var.get())
 
     def update_vignette_sigma(self, value):
-        self.vignette_sigma = int(float(value))
-        self.vignette_value.configure(text=str(self.vignette_sigma))
+        self.engine.set_param('vignette_sigma', int(float(value)))
+        self.vignette_value.configure(text=str(self.engine.params['vignette_sigma']))
 
     def update_pixel_size(self, value):
-        self.pixel_size = int(float(value))
-        self.pixel_value.configure(text=str(self.pixel_size))
+        self.engine.set_param('pixel_size', int(float(value)))
+        self.pixel_value.configure(text=str(self.engine.params['pixel_size']))
 
     def update_blur_level(self, value):
         blur_level = int(float(value))
         if blur_level % 2 == 0:
             blur_level += 1
-        self.blur_level = blur_level
-        self.blur_face_value.configure(text=str(self.blur_level))
+        self.engine.set_param('blur_level', blur_level)
+        self.blur_face_value.configure(text=str(blur_level))
 
     def get_current_params(self):
-        return {
-            'grayscale_levels': self.grayscale_levels,
-            'edge_threshold1': self.edge_threshold1,
-            'edge_threshold2': self.edge_threshold2,
-            'blur_kernel_size': self.blur_kernel_size,
-            'cartoon_edges_threshold': self.cartoon_edges_threshold,
-            'cartoon_color_sigma': self.cartoon_color_sigma,
-            'vignette_sigma': self.vignette_sigma,
-            'pixel_size': self.pixel_size,
-            'blur_level': self.blur_level
-        }
+        return self.engine.get_current_params()
 
     def update_grayscale_levels(self, value):
-        self.grayscale_levels = int(float(value))
-        self.levels_value.configure(text=str(self.grayscale_levels))
+        self.engine.set_param('grayscale_levels', int(float(value)))
+        self.levels_value.configure(text=str(self.engine.params['grayscale_levels']))
 
     def update_edge_threshold1(self, value):
-        self.edge_threshold1 = int(float(value))
-        self.edge_value1.configure(text=str(self.edge_threshold1))
+        self.engine.set_param('edge_threshold1', int(float(value)))
+        self.edge_value1.configure(text=str(self.engine.params['edge_threshold1']))
 
     def update_edge_threshold2(self, value):
-        self.edge_threshold2 = int(float(value))
-        self.edge_value2.configure(text=str(self.edge_threshold2))
+        self.engine.set_param('edge_threshold2', int(float(value)))
+        self.edge_value2.configure(text=str(self.engine.params['edge_threshold2']))
 
     def update_blur_kernel(self, value):
         kernel_size = int(float(value))
         if kernel_size % 2 == 0:
             kernel_size += 1
-        self.blur_kernel_size = kernel_size
-        self.blur_value.configure(text=str(self.blur_kernel_size))
+        self.engine.set_param('blur_kernel_size', kernel_size)
+        self.blur_value.configure(text=str(kernel_size))
 
     def update_cartoon_edge(self, value):
         threshold = int(float(value))
         if threshold % 2 == 0:
             threshold += 1
-        self.cartoon_edges_threshold = threshold
-        self.cartoon_edge_value.configure(text=str(self.cartoon_edges_threshold))
+        self.engine.set_param('cartoon_edges_threshold', threshold)
+        self.cartoon_edge_value.configure(text=str(threshold))
 
     def update_cartoon_color(self, value):
-        self.cartoon_color_sigma = int(float(value))
-        self.cartoon_color_value.configure(text=str(self.cartoon_color_sigma))
+        self.engine.set_param('cartoon_color_sigma', int(float(value)))
+        self.cartoon_color_value.configure(text=str(self.engine.params['cartoon_color_sigma']))
 
     def update_status_text(self):
         filter_names = [
@@ -570,8 +590,9 @@ class VideoFilterApp:
             "Edge Detection Face"
         ]
 
-        if self.current_filter < len(filter_names):
-            filter_name = filter_names[self.current_filter]
+        current_filter = self.engine.current_filter
+        if current_filter < len(filter_names):
+            filter_name = filter_names[current_filter]
         else:
             filter_name = "Unknown Filter"
 
@@ -579,21 +600,25 @@ class VideoFilterApp:
 
     def update_status(self):
         if self.is_running:
-            self.video_displays['fps_label'].configure(text=f"FPS: {self.fps:.1f}")
+            fps_text = f"FPS: {self.engine.fps:.1f}"
+            lag = self.engine.stats.summary().get("latency.capture_to_display")
+            if lag is not None:
+                fps_text += f" | Lag: {lag['p50']:.0f} ms"
+            recorder = self.recorder
+            if recorder is not None and recorder.frames_dropped:
+                fps_text += f" | Rec dropped: {recorder.frames_dropped}"
+            if self.stream_server is not None:
+                fps_text += f" | Viewers: {self.stream_server.broadcaster.clients}"
+            if self.engine.quality_controller is not None:
+                fps_text += f" | Quality: {self.engine.quality_controller.level_index}"
+            self.video_displays['fps_label'].configure(text=fps_text)
             self.window.after(1000, self.update_status)
 
     def take_screenshot(self):
-        if hasattr(self, 'current_frame'):
-            params = {
-                'grayscale_levels': self.grayscale_levels,
-                'edge_threshold1': self.edge_threshold1,
-                'edge_threshold2': self.edge_threshold2,
-                'blur_kernel_size': self.blur_kernel_size,
-                'cartoon_edges_threshold': self.cartoon_edges_threshold,
-                'cartoon_color_sigma': self.cartoon_color_sigma
-            }
-
-            save_screenshot(self.screenshot_folder, self.current_frame, None, self.current_filter, params)
+        if self.engine.current_frame is not None:
+            params = self.engine.get_current_params()
+
+            save_screenshot(self.screenshot_folder, self.engine.current_frame, None, self.engine.current_filter, params)
 
             self.video_displays['status_label'].configure(text=f"Status: Screenshots saved successfully")
 
@@ -601,65 +626,98 @@ class VideoFilterApp:
             self.screenshot_btn.configure(fg_color=("green", "green"))
             self.window.after(500, lambda: self.screenshot_btn.configure(fg_color=original_color))
 
-    def process_video(self):
-        while self.is_running:
-            ret, frame = self.cap.read()
-            if not ret:
-                show_error("Can't receive frame from camera")
-                break
-
-            self.current_frame = frame.copy()
-
-            frame = cv2.resize(frame, (480, 360))
+    def toggle_recording(self):
+        if self.recorder is None:
+            recordings_folder = ensure_screenshot_directory("recordings")
+            fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+            self.recorder = VideoRecorder(
+                recording_filename(recordings_folder), fps=fps, stats=self.engine.stats
+            ).start()
+            self.record_btn.configure(text="Stop Recording", fg_color=("#ef4444", "#dc2626"))
+            self.video_displays['status_label'].configure(text="Status: Recording...")
+        else:
+            recorder = self.recorder
+            self.recorder = None
+            summary = recorder.stop()
+            self.record_btn.configure(text="Record", fg_color=("#059669", "#10b981"))
+            self.video_displays['status_label'].configure(
+                text=f"Status: Saved {summary['frames_written']} frames "
+                     f"({summary['frames_dropped']} dropped) to {summary['path']}"
+            )
 
-            original_display = frame.copy()
+    def toggle_stats_overlay(self):
+        self.engine.show_stats_overlay = self.overlay_var.get()
 
-            # Get all current parameters
-            params = self.get_current_params()
+    def export_stats(self):
+        stats_folder = ensure_screenshot_directory("stats")
+        json_filename, _ = save_pipeline_stats(stats_folder, self.engine.stats)
+        self.video_displays['status_label'].configure(text=f"Status: Stats saved to {json_filename}")
 
-            # Check if we're in a transition
-            if self.transition.is_transitioning:
-                # Update transition state
-                self.transition.update()
+    def process_video(self):
+        if not self.engine.run(self.cap, self.display_frames) and self.is_running:
+            show_error("Can't receive frame from camera")
 
-                # Apply transition effect
-                output = self.transition.apply(frame)
+    def display_frames(self, original_display, output):
+        frame_id = self.engine.last_frame_id
 
-                # If transition returned None, it's complete, so apply the current filter
-                if output is None:
-                    output = apply_filter(frame, self.current_filter, params)
-            else:
-                # Apply the current filter
-                output = apply_filter(frame, self.current_filter, params)
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.submit(output)
+        if self.stream_server is not None:
+            self.stream_server.publish(output)
 
-            # Calculate FPS
-            fps_result, self.frame_count, self.last_time = calculate_fps(
-                self.frame_count, self.last_time
-            )
-            if fps_result is not None:
-                self.fps = fps_result
+        # Convert frames to format for display
+        height, width = output.shape[:2]
 
-            # Convert frames to format for display
+        with self.engine.stats.time("color_convert"):
             original_rgb = cv2.cvtColor(original_display, cv2.COLOR_BGR2RGB)
             original_img = Image.fromarray(original_rgb)
-            original_imgtk = ctk.CTkImage(light_image=original_img, dark_image=original_img, size=(480, 360))
+            original_imgtk = ctk.CTkImage(light_image=original_img, dark_image=original_img, size=(width, height))
 
             filtered_rgb = cv2.cvtColor(output, cv2.COLOR_BGR2RGB)
             filtered_img = Image.fromarray(filtered_rgb)
-            filtered_imgtk = ctk.CTkImage(light_image=filtered_img, dark_image=filtered_img, size=(480, 360))
+            filtered_imgtk = ctk.CTkImage(light_image=filtered_img, dark_image=filtered_img, size=(width, height))
+
+        # Update the UI
+        with self.display_lock:
+            previous = self.pending_display
+            self.pending_display = (frame_id, original_imgtk, filtered_imgtk)
+
+        if previous is None:
+            self.window.after(0, self.update_video_labels)
+        else:
+            self.engine.latency.mark_superseded(previous[0])
+
+    def update_video_labels(self):
+        with self.display_lock:
+            pending = self.pending_display
+            self.pending_display = None
+        if pending is None:
+            return
+
+        frame_id, original_imgtk, filtered_imgtk = pending
+        with self.engine.stats.time("display"):
+            self.video_displays['original_video_label'].imgtk = original_imgtk
+            self.video_displays['original_video_label'].configure(image=original_imgtk)
 
-            # Update the UI
-            self.window.after(0, self.update_video_labels, original_imgtk, filtered_imgtk)
+            self.video_displays['filtered_video_label'].imgtk = filtered_imgtk
+            self.video_displays['filtered_video_label'].configure(image=filtered_imgtk)
 
-    def update_video_labels(self, original_imgtk, filtered_imgtk):
-        self.video_displays['original_video_label'].imgtk = original_imgtk
-        self.video_displays['original_video_label'].configure(image=original_imgtk)
+        self.engine.latency.stamp_displayed(frame_id)
 
-        self.video_displays['filtered_video_label'].imgtk = filtered_imgtk
-        self.video_displays['filtered_video_label'].configure(image=filtered_imgtk)
+        if self.on_first_frame is not None:
+            on_first_frame, self.on_first_frame = self.on_first_frame, None
+            on_first_frame()
 
     def on_closing(self):
         self.is_running = False
+        self.engine.stop()
+        if self.recorder is not None:
+            self.recorder.stop()
+            self.recorder = None
+        if self.stream_server is not None:
+            self.stream_server.stop()
+            self.stream_server = None
         if hasattr(self, 'cap') and self.cap.isOpened():
             self.cap.release()
         self.window.destroy()
@@ -0,0 +1,116 @@
+"""Image operators shared by Image Lab (Part1) and Live Cam FX (Part2).
+
+Contract for every operator:
+
+* dtype: src must be uint8, either 2-D grayscale or HxWx3 BGR. Anything
+  else raises TypeError; results are always uint8 (saturated, not wrapped).
+* dst: when given it must be a uint8 array of exactly the output shape and
+  is written and returned; when None a new array is allocated. dst may be
+  src itself or a view into a larger frame (e.g. a face ROI) for every
+  operator whose output shape equals its input shape, so filters can work
+  in place without temporaries.
+* threading: operators keep no state and may be called from any number of
+  threads at once. Parallelism inside a call is OpenCV's own thread pool;
+  code that already spreads work over its own threads or processes should
+  call configure_threads(1) to avoid oversubscribing the cores.
+"""
+import cv2
+import numpy as np
+
+SEPIA_KERNEL = np.array([
+    [0.393, 0.769, 0.189],
+    [0.349, 0.686, 0.168],
+    [0.272, 0.534, 0.131]
+])
+
+SHARPEN_KERNEL = np.array([
+    [0, -1, 0],
+    [-1, 5, -1],
+    [0, -1, 0]
+])
+
+
+def configure_threads(count):
+    """Set the size of OpenCV's internal thread pool (0 = OpenCV default)"""
+    cv2.setNumThreads(count)
+
+
+def _check_src(src, channels=None):
+    if src.dtype != np.uint8:
+        raise TypeError(f"expected a uint8 image, got {src.dtype}")
+    if src.ndim == 2:
+        src_channels = 1
+    elif src.ndim == 3 and src.shape[2] == 3:
+        src_channels = 3
+    else:
+        raise TypeError(f"expected a grayscale or BGR image, got shape {src.shape}")
+    if channels is not None and src_channels != channels:
+        raise TypeError(f"expected a {channels}-channel image, got {src_channels}")
+    return src_channels
+
+
+def _check_dst(dst, shape):
+    if dst is not None and (dst.shape != shape or dst.dtype != np.uint8):
+        raise ValueError(f"dst must be uint8 with shape {shape}, got {dst.dtype} {dst.shape}")
+    return dst
+
+
+def to_gray(src, dst=None):
+    """Grayscale version of src; a 2-D src is copied into dst (or a new array)"""
+    if _check_src(src) == 1:
+        if dst is None:
+            return src.copy()
+        _check_dst(dst, src.shape)[...] = src
+        return dst
+    return cv2.cvtColor(src, cv2.COLOR_BGR2GRAY, dst=_check_dst(dst, src.shape[:2]))
+
+
+def gray_to_bgr(src, dst=None):
+    _check_src(src, channels=1)
+    return cv2.cvtColor(src, cv2.COLOR_GRAY2BGR, dst=_check_dst(dst, src.shape + (3,)))
+
+
+def gaussian_blur(src, ksize, dst=None):
+    _check_src(src)
+    return cv2.GaussianBlur(src, (ksize, ksize), 0, dst=_check_dst(dst, src.shape))
+
+
+def box_blur(src, ksize, dst=None):
+    """Mean filter; running sums keep the cost independent of ksize"""
+    _check_src(src)
+    return cv2.blur(src, (ksize, ksize), dst=_check_dst(dst, src.shape))
+
+
+def median_blur(src, ksize, dst=None):
+    """Median filter.
+
+    OpenCV picks the algorithm from ksize and the image size: for ksize > 5
+    the constant-time histogram median is only used on images of about 4 MP
+    and up; smaller images take a path whose cost grows with ksize (up to
+    15x15 below 1 MP, 9x9 below 4 MP).
+    """
+    _check_src(src)
+    return cv2.medianBlur(src, ksize, dst=_check_dst(dst, src.shape))
+
+
+def sharpen(src, dst=None):
+    _check_src(src)
+    return cv2.filter2D(src, -1, SHARPEN_KERNEL, dst=_check_dst(dst, src.shape))
+
+
+def sepia(src, dst=None):
+    """Sepia tone; cv2.transform saturates to uint8 so no clip pass is needed"""
+    _check_src(src, channels=3)
+    return cv2.transform(src, SEPIA_KERNEL, dst=_check_dst(dst, src.shape))
+
+
+def invert(src, dst=None):
+    _check_src(src)
+    return cv2.bitwise_not(src, dst=_check_dst(dst, src.shape))
+
+
+def canny(src, threshold1, threshold2, dst=None):
+    """Canny edge map (2-D) of a grayscale or BGR image"""
+    if _check_src(src) == 3:
+        src = cv2.cvtColor(src, cv2.COLOR_BGR2GRAY)
+    return cv2.Canny(src, threshold1, threshold2, edges=_check_dst(dst, src.shape))